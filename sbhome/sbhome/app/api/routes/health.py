@@ -1,9 +1,14 @@
 """
 Health check API routes
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from typing import Dict, Any
 from app.core.cache import cache
+from app.core.events import event_bus
+from app.core.snapshot import cache_snapshot
+from app.core.http import http_clients
+from app.core.refresh import refresh_scheduler
+from app.core.responses import json_response
 from app.services.health_check_service import health_check_service
 
 router = APIRouter()
@@ -14,11 +19,17 @@ async def health_check():
     """Basic health check endpoint"""
     return {
         "status": "healthy",
-        "cache_size": cache.size()
+        "cache_size": cache.size(),
+        "cache": cache.stats(),
+        "cache_snapshot": cache_snapshot.stats(),
+        "http_clients": http_clients.stats(),
+        "refresh": refresh_scheduler.stats(),
+        "health_sweeps": health_check_service.sweep_stats(),
+        "stream": event_bus.stats()
     }
 
 
-@router.get("/status")
-async def get_health_status() -> Dict[str, Any]:
+@router.get("/status", response_model=Dict[str, Any])
+async def get_health_status(request: Request) -> Response:
     """Get health status of all monitored services"""
-    return await health_check_service.get_health_status()
+    return json_response(request, await health_check_service.get_health_status())
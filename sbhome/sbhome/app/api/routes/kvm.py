@@ -1,18 +1,19 @@
 """
 KVM API routes
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import List, Dict, Any
 
+from app.core.responses import json_response
 from app.services.kvm_service import kvm_service
 
 router = APIRouter()
 
 
-@router.get("/devices")
-async def get_kvm_devices() -> List[Dict[str, Any]]:
+@router.get("/devices", response_model=List[Dict[str, Any]])
+async def get_kvm_devices(request: Request) -> Response:
     """Get all KVM devices"""
     try:
-        return await kvm_service.get_kvm_devices()
+        return json_response(request, await kvm_service.get_kvm_devices())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,83 +1,207 @@
 """
 Media API routes (Plex, Radarr, SABnzbd, Overseerr)
 """
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from typing import List, Dict, Any, Optional
+import asyncio
+import hmac
+import time
 
+from app.core.config import settings
+from app.core.http import error_summary
+from app.core.refresh import refresh_scheduler
+from app.core.responses import json_response
 from app.services.media_service import (
     tautulli_service,
     radarr_service,
+    sonarr_service,
     sabnzbd_service,
-    overseerr_service
+    overseerr_service,
+    arr_queues
 )
 
 router = APIRouter()
 
+# Dashboard response key -> (service method, default when nothing is cached)
+DASHBOARD_SECTIONS = {
+    "streams": (tautulli_service.get_activity, {"stream_count": 0, "sessions": []}),
+    "todaysEpisodes": (tautulli_service.get_recently_added, []),
+    "radarrQueue": (radarr_service.get_queue, {"totalRecords": 0, "records": []}),
+    "sabnzbdStatus": (sabnzbd_service.get_status, {"status": "Unknown", "queue_items": "0"}),
+    "overseerrCounts": (overseerr_service.get_request_counts, {"total": 0, "pending": 0})
+}
+if sonarr_service.configured:
+    DASHBOARD_SECTIONS["sonarrQueue"] = (sonarr_service.get_queue, {"totalRecords": 0, "records": []})
 
-@router.get("/streams")
-async def get_streams() -> Dict[str, Any]:
+
+@router.get("/streams", response_model=Dict[str, Any])
+async def get_streams(request: Request) -> Response:
     """Get current Plex streams"""
     try:
-        return await tautulli_service.get_activity()
+        return json_response(request, await tautulli_service.get_activity())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/episodes/today")
-async def get_todays_episodes() -> List[Dict[str, Any]]:
+@router.post("/webhooks/tautulli")
+async def tautulli_webhook(
+    payload: Dict[str, Any],
+    token: Optional[str] = Query(None),
+    x_webhook_token: Optional[str] = Header(None)
+) -> Dict[str, Any]:
+    """Receive Tautulli play/stop/pause/resume notifications
+
+    Configure Tautulli's Webhook agent to POST the JSON in
+    WEBHOOK_TEMPLATE (app/services/tautulli_sessions.py) here, passing
+    TAUTULLI_WEBHOOK_TOKEN as ?token= or an X-Webhook-Token header.
+    Webhooks are disabled until a token is configured.
+    """
+    if not settings.TAUTULLI_WEBHOOK_TOKEN:
+        raise HTTPException(status_code=404, detail="Tautulli webhooks are not enabled")
+    if not hmac.compare_digest(
+        (x_webhook_token or token or "").encode(), settings.TAUTULLI_WEBHOOK_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid webhook token")
+
+    changed = await tautulli_service.handle_webhook(payload)
+    return {"applied": changed, "sessions": tautulli_service.sessions.stats()["sessions"]}
+
+
+@router.get("/webhooks/tautulli")
+async def tautulli_webhook_stats() -> Dict[str, Any]:
+    """Get Tautulli webhook and reconcile counters"""
+    return tautulli_service.sessions.stats()
+
+
+@router.get("/episodes/today", response_model=List[Dict[str, Any]])
+async def get_todays_episodes(request: Request) -> Response:
     """Get today's episodes"""
     try:
-        return await tautulli_service.get_recently_added()
+        return json_response(request, await tautulli_service.get_recently_added())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/queue/radarr")
-async def get_radarr_queue() -> Dict[str, Any]:
+@router.get("/queue/radarr", response_model=Dict[str, Any])
+async def get_radarr_queue(request: Request) -> Response:
     """Get Radarr download queue"""
     try:
-        return await radarr_service.get_queue()
+        return json_response(request, await radarr_service.get_queue())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/queue/sonarr", response_model=Dict[str, Any])
+async def get_sonarr_queue(request: Request) -> Response:
+    """Get Sonarr download queue"""
+    if not sonarr_service.configured:
+        raise HTTPException(status_code=404, detail="Sonarr is not configured")
+    try:
+        return json_response(request, await sonarr_service.get_queue())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/queue", response_model=Dict[str, Any])
+async def get_combined_queue(
+    request: Request,
+    status: Optional[str] = Query(None, description="e.g. downloading, queued, paused, completed"),
+    source: Optional[str] = Query(None, description="radarr or sonarr"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+) -> Response:
+    """Get Radarr and Sonarr queue records, filtered and paginated, with per-upstream fetch timings"""
+    try:
+        return json_response(request, await arr_queues.query(status, source, limit, offset))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/queue/sabnzbd")
-async def get_sabnzbd_status() -> Dict[str, Any]:
+@router.get("/queue/sabnzbd", response_model=Dict[str, Any])
+async def get_sabnzbd_status(request: Request) -> Response:
     """Get SABnzbd queue status"""
     try:
-        return await sabnzbd_service.get_status()
+        return json_response(request, await sabnzbd_service.get_status())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/requests/overseerr")
-async def get_overseerr_counts() -> Dict[str, Any]:
+@router.get("/requests/overseerr", response_model=Dict[str, Any])
+async def get_overseerr_counts(request: Request) -> Response:
     """Get Overseerr request counts"""
     try:
-        return await overseerr_service.get_request_counts()
+        return json_response(request, await overseerr_service.get_request_counts())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/dashboard")
-async def get_media_dashboard() -> Dict[str, Any]:
-    """Get all media data for dashboard"""
+async def _timed_load(name: str, method, timings: Dict[str, float]) -> Any:
+    """Run one dashboard section, recording how long it took"""
+    start = time.perf_counter()
+    try:
+        return await method()
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000
+
+
+def _consume_result(task: asyncio.Task):
+    """Retrieve a late section's outcome so its errors aren't reported as unhandled"""
+    if not task.cancelled():
+        task.exception()
+
+
+@router.get("/dashboard", response_model=Dict[str, Any])
+async def get_media_dashboard(request: Request) -> Response:
+    """Get all media data for dashboard
+
+    Waits at most MEDIA_DASHBOARD_DEADLINE_MS. Sections that aren't ready
+    (or failed) are served from stale cache, or an empty default, and
+    marked stale in sectionStatus; late fetches keep running and fill the
+    cache for the next request. Section latencies go in Server-Timing.
+    """
     try:
-        streams, episodes, radarr, sabnzbd, overseerr = await asyncio.gather(
-            tautulli_service.get_activity(),
-            tautulli_service.get_recently_added(),
-            radarr_service.get_queue(),
-            sabnzbd_service.get_status(),
-            overseerr_service.get_request_counts(),
-            return_exceptions=True
-        )
-
-        return {
-            "streams": streams if not isinstance(streams, Exception) else {"stream_count": 0, "sessions": []},
-            "todaysEpisodes": episodes if not isinstance(episodes, Exception) else [],
-            "radarrQueue": radarr if not isinstance(radarr, Exception) else {"totalRecords": 0, "records": []},
-            "sabnzbdStatus": sabnzbd if not isinstance(sabnzbd, Exception) else {"status": "Unknown", "queue_items": "0"},
-            "overseerrCounts": overseerr if not isinstance(overseerr, Exception) else {"total": 0, "pending": 0}
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        tasks = {
+            name: asyncio.create_task(_timed_load(name, method, timings))
+            for name, (method, _) in DASHBOARD_SECTIONS.items()
         }
+        await asyncio.wait(tasks.values(), timeout=settings.MEDIA_DASHBOARD_DEADLINE_MS / 1000)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        result: Dict[str, Any] = {}
+        section_status: Dict[str, Dict[str, Any]] = {}
+        server_timing = []
+        for name, task in tasks.items():
+            method, fallback = DASHBOARD_SECTIONS[name]
+            cached = refresh_scheduler.peek(method)
+            status: Dict[str, Any] = {"stale": False}
+
+            if task.done() and task.exception() is None:
+                value = task.result()
+                # get_or_fetch answers with the old value while it revalidates
+                status["stale"] = cached is not None and cached[0] is value and not cached[1]
+            else:
+                if task.done():
+                    print(f"Media dashboard section {name} failed: {task.exception()}")
+                    status["error"] = error_summary(task.exception())
+                else:
+                    task.add_done_callback(_consume_result)
+                value = cached[0] if cached is not None else fallback
+                status["stale"] = True
+
+            result[name] = value
+            section_status[name] = status
+            timing = f"{name};dur={timings.get(name, elapsed_ms):.1f}"
+            if status["stale"]:
+                timing += ';desc="stale"'
+            server_timing.append(timing)
+
+        result["sectionStatus"] = section_status
+        server_timing.append(f"total;dur={elapsed_ms:.1f}")
+
+        response = json_response(request, result)
+        response.headers["Server-Timing"] = ", ".join(server_timing)
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,45 +1,67 @@
 """
 Network API routes (UniFi)
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import List, Dict, Any
 
+from app.core.responses import json_response
 from app.services.unifi_service import unifi_service
 
 router = APIRouter()
 
 
-@router.get("/unifi/devices")
-async def get_unifi_devices() -> List[Dict[str, Any]]:
+@router.get("/unifi/devices", response_model=List[Dict[str, Any]])
+async def get_unifi_devices(request: Request) -> Response:
     """Get all UniFi network devices"""
     try:
-        return await unifi_service.get_devices()
+        return json_response(request, await unifi_service.get_devices())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/unifi/gateway")
-async def get_unifi_gateway() -> Dict[str, Any]:
+@router.get("/unifi/gateway", response_model=Dict[str, Any])
+async def get_unifi_gateway(request: Request) -> Response:
     """Get gateway statistics"""
     try:
-        return await unifi_service.get_gateway_stats()
+        return json_response(request, await unifi_service.get_gateway_stats())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/unifi/clients")
-async def get_unifi_clients() -> List[Dict[str, Any]]:
+@router.get("/unifi/clients", response_model=List[Dict[str, Any]])
+async def get_unifi_clients(request: Request) -> Response:
     """Get all connected clients"""
     try:
-        return await unifi_service.get_clients()
+        return json_response(request, await unifi_service.get_clients())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/unifi/stats")
-async def get_network_stats() -> Dict[str, Any]:
+@router.get("/unifi/stats", response_model=Dict[str, Any])
+async def get_network_stats(request: Request) -> Response:
     """Get aggregated network statistics"""
     try:
-        return await unifi_service.get_network_stats()
+        return json_response(request, await unifi_service.get_network_stats())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/unifi/rates", response_model=Dict[str, Any])
+async def get_unifi_rates(request: Request, top: int = Query(10, ge=1, le=100)) -> Response:
+    """Get per-client throughput rates and the top talkers by current rate"""
+    try:
+        return json_response(request, await unifi_service.get_client_rates(top))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/unifi/session")
+async def get_unifi_session() -> Dict[str, Any]:
+    """Get UniFi session login counts and request latencies"""
+    return unifi_service.session.stats()
+
+
+@router.get("/unifi/events")
+async def get_unifi_events() -> Dict[str, Any]:
+    """Get UniFi event-stream status and counters"""
+    return unifi_service.events.stats()
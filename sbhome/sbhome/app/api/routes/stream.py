@@ -0,0 +1,44 @@
+"""
+Server-Sent Events stream of dashboard changes
+"""
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.core.events import event_bus
+
+router = APIRouter()
+
+
+async def _event_stream(last_event_id: Optional[str], sections: Optional[set]) -> AsyncIterator[str]:
+    """Format bus events as SSE frames"""
+    yield "retry: 3000\n\n"
+    async for event in event_bus.subscribe(last_event_id, keepalive=settings.STREAM_KEEPALIVE):
+        if event is None:
+            yield ": keepalive\n\n"
+            continue
+        seq, section, data = event
+        if sections is not None and section.split(":", 1)[0] not in sections:
+            continue
+        yield f"id: {event_bus.event_id(seq)}\ndata: {data}\n\n"
+
+
+@router.get("")
+async def stream(
+    sections: Optional[str] = Query(None, description="Comma-separated: streams, queues, health, network"),
+    last_event_id: Optional[str] = Query(None, description="Resume cursor, for clients that can't send the header"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Push changed dashboard sections as they are refreshed
+
+    Each event's data is {"section": ..., "data": ...}. On connect (or when
+    the resume cursor is too old) the latest value of every section is sent
+    first; reconnecting with Last-Event-ID replays only what was missed.
+    """
+    wanted = {s.strip() for s in sections.split(",") if s.strip()} if sections else None
+    return StreamingResponse(
+        _event_stream(last_event_id_header or last_event_id, wanted),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
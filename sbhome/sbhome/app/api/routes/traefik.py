@@ -1,45 +1,58 @@
 """
 Traefik API routes
 """
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Dict, Any, Optional, Union
 
+from app.core.responses import json_response
 from app.services.traefik_service import traefik_service
 
 router = APIRouter()
 
 
-@router.get("/services")
-async def get_services() -> Dict[str, Any]:
+@router.get("/services", response_model=Dict[str, Any])
+async def get_services(request: Request) -> Response:
     """Get all Traefik services"""
     try:
-        return await traefik_service.get_services()
+        return json_response(request, await traefik_service.get_services())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/routes")
-async def get_routes() -> List[Dict[str, Any]]:
-    """Get all routes"""
+@router.get("/routes", response_model=Union[List[Dict[str, Any]], Dict[str, Any]])
+async def get_routes(
+    request: Request,
+    q: Optional[str] = Query(None, description="Prefix of a name, domain, host or container (words are ANDed)"),
+    static: Optional[bool] = Query(None, description="true for static routes, false for Docker routes"),
+    host: Optional[str] = Query(None, description="Exact backend host"),
+    domain: Optional[str] = Query(None, description="Public domain or parent zone, e.g. example.com"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: Optional[int] = Query(None, ge=0)
+) -> Response:
+    """Get all routes, or a page of matching routes when any filter is given"""
     try:
-        return await traefik_service.get_routes()
+        if q is None and static is None and host is None and domain is None and limit is None and offset is None:
+            return json_response(request, await traefik_service.get_routes())
+        return json_response(request, await traefik_service.query_routes(
+            q, static, host, domain, limit or 50, offset or 0
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/routes/docker")
-async def get_docker_routes() -> List[Dict[str, Any]]:
+@router.get("/routes/docker", response_model=List[Dict[str, Any]])
+async def get_docker_routes(request: Request) -> Response:
     """Get Docker container routes only"""
     try:
-        return await traefik_service.get_docker_routes()
+        return json_response(request, await traefik_service.get_docker_routes())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/routes/static")
-async def get_static_routes() -> List[Dict[str, Any]]:
+@router.get("/routes/static", response_model=List[Dict[str, Any]])
+async def get_static_routes(request: Request) -> Response:
     """Get static routes only"""
     try:
-        return await traefik_service.get_static_routes()
+        return json_response(request, await traefik_service.get_static_routes())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
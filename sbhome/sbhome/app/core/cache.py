@@ -1,45 +1,350 @@
 """
 Simple in-memory cache with TTL
 """
-from datetime import datetime, timedelta
-from typing import Any, Optional
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Set, Tuple, Union
 import asyncio
+import hashlib
+import json
+import sys
+import time
+
+from app.core.config import settings
+
+
+# A TTL in seconds, or a callable evaluated once the loader has returned
+TTL = Union[float, Callable[[], float]]
+
+
+def _prefix(key: str) -> str:
+    """Stats bucket for a key, e.g. "tautulli" for "tautulli:activity" """
+    return key.split(":", 1)[0]
+
+
+def json_default(value: Any) -> Any:
+    """Serialize records by their dict form, anything else as a string"""
+    to_dict = getattr(value, "to_dict", None)
+    return to_dict() if to_dict is not None else str(value)
+
+
+class Payload:
+    """A value's serialized JSON body and its ETag, computed once per cache write"""
+
+    __slots__ = ("body", "etag", "variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.variants: Dict[str, bytes] = {}  # content-encoding -> compressed body
+
+
+def serialize(value: Any) -> Optional[Payload]:
+    """Serialize value the way the API returns it, or None if it isn't JSON-able"""
+    try:
+        body = json.dumps(value, default=json_default, ensure_ascii=False, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return Payload(body.encode("utf-8"))
 
 
 class SimpleCache:
-    """Simple in-memory cache with TTL support"""
+    """Simple in-memory cache with TTL support
+
+    Reads never take a lock: entries are immutable tuples swapped in with a
+    single dict assignment, so a reader always sees a whole entry. Writes
+    are serialized per key. Each entry also carries its serialized JSON and
+    ETag, so routes can send cached values without re-encoding them. Expiry
+    uses time.monotonic() so wall-clock jumps (NTP, DST) don't expire or
+    resurrect entries.
+
+    The cache is bounded by entry count and approximate byte size (value
+    plus serialized body, estimated from the JSON length); the least
+    recently used entries are evicted first. Entries past their stale window
+    are dropped by a periodic sweep even if nobody reads them again.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._keys_by_value: Dict[int, str] = {}  # id(value) -> key, for payload()
+        self._bytes = 0
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._unawaited: Set[asyncio.Task] = set()  # background loads nobody waits on
+        self._evictions: Dict[str, int] = {}
+        self._expirations: Dict[str, int] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def _lock_for(self, key: str) -> asyncio.Lock:
+        """Get the write lock for key"""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks.setdefault(key, asyncio.Lock())
+        return lock
+
+    def _remove(self, key: str, counters: Optional[Dict[str, int]] = None):
+        """Drop key and account for why it left"""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[3]
+        self._unindex(key, entry)
+        lock = self._locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._locks[key]
+        if counters is not None:
+            prefix = _prefix(key)
+            counters[prefix] = counters.get(prefix, 0) + 1
 
-    def __init__(self):
-        self._cache = {}
-        self._lock = asyncio.Lock()
+    def _unindex(self, key: str, entry: tuple):
+        """Forget entry's value -> key mapping, unless another key now owns it"""
+        if self._keys_by_value.get(id(entry[0])) == key:
+            del self._keys_by_value[id(entry[0])]
 
     async def get(self, key: str) -> Optional[Any]:
         """Get cached value if not expired"""
-        async with self._lock:
-            if key in self._cache:
-                value, expires_at = self._cache[key]
-                if datetime.now() < expires_at:
-                    return value
-                else:
-                    # Expired, remove it
-                    del self._cache[key]
+        entry = self._cache.get(key)
+        if entry is None:
             return None
 
-    async def set(self, key: str, value: Any, ttl: int = 30):
-        """Set cached value with TTL in seconds"""
-        async with self._lock:
-            expires_at = datetime.now() + timedelta(seconds=ttl)
-            self._cache[key] = (value, expires_at)
+        value, expires_at, stale_until = entry[:3]
+        now = time.monotonic()
+        if now < expires_at:
+            self._cache.move_to_end(key)
+            return value
+        if now >= stale_until and self._cache.get(key) is entry:
+            # Past the stale window too, remove it
+            self._remove(key, self._expirations)
+        return None
+
+    def peek(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Get (value, is_fresh) for key, including values in their stale window"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at, stale_until = entry[:3]
+        now = time.monotonic()
+        if now >= stale_until:
+            return None
+        return value, now < expires_at
+
+    def payload(self, value: Any) -> Optional[Payload]:
+        """Serialized form of a value this cache currently holds, else None"""
+        key = self._keys_by_value.get(id(value))
+        if key is None:
+            return None
+        entry = self._cache.get(key)
+        if entry is None or entry[0] is not value:
+            return None
+        return entry[4]
+
+    async def set(self, key: str, value: Any, ttl: int = 30, stale_ttl: int = 0):
+        """Set cached value with TTL in seconds
+
+        stale_ttl keeps the value around for that many extra seconds so
+        get_or_fetch can serve it while a refresh runs in the background.
+        """
+        payload = serialize(value)
+        # The value itself is estimated at roughly its JSON length, plus the body
+        size = 2 * len(payload.body) if payload is not None else sys.getsizeof(value)
+        async with self._lock_for(key):
+            expires_at = time.monotonic() + ttl
+            old = self._cache.get(key)
+            if old is not None:
+                self._bytes -= old[3]
+                self._unindex(key, old)
+            self._cache[key] = (value, expires_at, expires_at + stale_ttl, size, payload)
+            self._keys_by_value[id(value)] = key
+            self._cache.move_to_end(key)
+            self._bytes += size
+            self._evict(keep=key)
+
+    async def set_stale(self, key: str, value: Any, stale_ttl: int):
+        """Set a value that is already expired but servable for stale_ttl seconds
+
+        Used for warm-start data: the first get_or_fetch returns it and
+        triggers a refresh in the background.
+        """
+        await self.set(key, value, ttl=0, stale_ttl=stale_ttl)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over (key, value) for entries not past their stale window"""
+        now = time.monotonic()
+        for key, entry in list(self._cache.items()):
+            if now < entry[2]:
+                yield key, entry[0]
+
+    def _evict(self, keep: str):
+        """Evict least recently used entries until within bounds"""
+        while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._cache))
+            if oldest == keep:
+                # A single entry larger than max_bytes is still kept
+                break
+            self._remove(oldest, self._evictions)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: TTL = 30,
+        stale_ttl: TTL = 0
+    ) -> Any:
+        """Get cached value, loading it at most once per key
+
+        - Fresh value: returned directly.
+        - Stale value (expired but within stale_ttl): returned directly while
+          a single background refresh runs.
+        - Missing value: concurrent callers all wait on one loader call.
+
+        ttl and stale_ttl may be callables, evaluated after the loader
+        returns, for sources whose refresh interval depends on the data.
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            value, expires_at, stale_until = entry[:3]
+            now = time.monotonic()
+            if now < expires_at:
+                self._cache.move_to_end(key)
+                return value
+            if now < stale_until:
+                self._cache.move_to_end(key)
+                self._start_fetch(key, loader, ttl, stale_ttl, background=True)
+                return value
+
+        # Shield so a cancelled caller doesn't cancel the shared load
+        return await asyncio.shield(self._start_fetch(key, loader, ttl, stale_ttl))
+
+    async def refresh(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: TTL = 30,
+        stale_ttl: TTL = 0
+    ) -> Any:
+        """Reload key now, joining the in-flight load if there is one"""
+        return await asyncio.shield(self._start_fetch(key, loader, ttl, stale_ttl))
+
+    def _start_fetch(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: TTL,
+        stale_ttl: TTL,
+        background: bool = False
+    ) -> asyncio.Task:
+        """Return the in-flight load for key, starting one if needed
+
+        Errors are only logged for background loads that no caller awaits;
+        everyone else gets the exception.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, loader, ttl, stale_ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+            if background:
+                self._unawaited.add(task)
+        elif not background:
+            self._unawaited.discard(task)
+        return task
+
+    async def _fetch(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: TTL,
+        stale_ttl: TTL
+    ) -> Any:
+        """Run loader and store its result"""
+        value = await loader()
+        await self.set(
+            key,
+            value,
+            ttl=ttl() if callable(ttl) else ttl,
+            stale_ttl=stale_ttl() if callable(stale_ttl) else stale_ttl
+        )
+        return value
+
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        """Clear the in-flight marker and surface background errors"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        unawaited = task in self._unawaited
+        self._unawaited.discard(task)
+        if not task.cancelled() and task.exception() is not None and unawaited:
+            print(f"Cache refresh error for {key}: {task.exception()}")
+
+    def sweep(self) -> int:
+        """Drop every entry past its stale window, returns number removed"""
+        now = time.monotonic()
+        expired = [key for key, entry in self._cache.items() if now >= entry[2]]
+        for key in expired:
+            self._remove(key, self._expirations)
+        return len(expired)
+
+    def start_sweeper(self, interval: int = 60):
+        """Start the periodic expired-entry sweep"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval))
+
+    def stop_sweeper(self):
+        """Stop the periodic expired-entry sweep"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _sweep_loop(self, interval: int):
+        """Background loop that sweeps expired entries"""
+        while True:
+            await asyncio.sleep(interval)
+            removed = self.sweep()
+            if removed:
+                print(f"Cache sweep: removed {removed} expired entries")
 
     async def clear(self):
         """Clear all cached values"""
-        async with self._lock:
-            self._cache.clear()
+        self._cache.clear()
+        self._keys_by_value.clear()
+        self._locks.clear()
+        self._bytes = 0
 
     def size(self) -> int:
         """Get number of cached items"""
         return len(self._cache)
 
+    def stats(self) -> Dict[str, Any]:
+        """Get size and eviction counters, overall and per key prefix"""
+        prefixes: Dict[str, Dict[str, int]] = {}
+        for key, entry in self._cache.items():
+            bucket = prefixes.setdefault(
+                _prefix(key), {"entries": 0, "bytes": 0, "evictions": 0, "expirations": 0}
+            )
+            bucket["entries"] += 1
+            bucket["bytes"] += entry[3]
+
+        for counters, field in ((self._evictions, "evictions"), (self._expirations, "expirations")):
+            for prefix, count in counters.items():
+                bucket = prefixes.setdefault(
+                    prefix, {"entries": 0, "bytes": 0, "evictions": 0, "expirations": 0}
+                )
+                bucket[field] = count
+
+        return {
+            "entries": len(self._cache),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": sum(self._evictions.values()),
+            "expirations": sum(self._expirations.values()),
+            "prefixes": prefixes
+        }
+
 
 # Global cache instance
-cache = SimpleCache()
+cache = SimpleCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES
+)
@@ -13,18 +13,62 @@ class Settings(BaseSettings):
     TRAEFIK_HTTP_PROVIDER_URL: str = "http://host-cadre:8081"
     TAUTULLI_URL: str = ""
     TAUTULLI_API_KEY: str = ""
+    TAUTULLI_WEBHOOK_TOKEN: str = ""  # enables the webhook endpoint; required on every post
+    TAUTULLI_RECONCILE_INTERVAL: int = 300  # get_activity poll once webhooks arrive
     RADARR_URL: str = ""
     RADARR_API_KEY: str = ""
+    SONARR_URL: str = ""
+    SONARR_API_KEY: str = ""
     SABNZBD_URL: str = ""
     SABNZBD_API_KEY: str = ""
+    SABNZBD_ACTIVE_INTERVAL: int = 3  # seconds between polls while downloading
+    SABNZBD_IDLE_MAX_INTERVAL: int = 160  # idle/paused polling backs off up to this
     OVERSEERR_URL: str = ""
     OVERSEERR_API_KEY: str = ""
     UNIFI_URL: str = "https://192.168.86.1"
     UNIFI_USERNAME: str = "claude"
     UNIFI_PASSWORD: str = ""
+    UNIFI_EVENTS_ENABLED: bool = False  # keep clients current from the event websocket
+    UNIFI_EVENTS_URL: str = ""  # defaults to the controller's wss events endpoint
+    UNIFI_EVENTS_RESYNC_INTERVAL: int = 300  # seconds between full stat/sta resyncs
+    UNIFI_RATE_SAMPLES: int = 12  # byte counter samples kept per client for rates
 
     # Cache settings
     CACHE_TTL: int = 30  # seconds
+    CACHE_MAX_ENTRIES: int = 1000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # approximate, by JSON size
+    CACHE_SWEEP_INTERVAL: int = 60  # seconds
+
+    # Cache warm-start snapshot (disabled when path is empty)
+    CACHE_SNAPSHOT_PATH: str = ""
+    CACHE_SNAPSHOT_INTERVAL: int = 300  # seconds between periodic writes
+    CACHE_SNAPSHOT_MAX_AGE: int = 86400  # ignore snapshot entries older than this
+    CACHE_SNAPSHOT_STALE_TTL: int = 300  # how long restored entries may be served
+
+    # Upstream HTTP clients
+    HTTP_TIMEOUT: float = 10.0  # seconds
+    HTTP2_ENABLED: bool = False  # requires the h2 package
+
+    # DNS server for KVM discovery (defaults to the first resolv.conf nameserver)
+    DNS_SERVER: str = ""
+
+    # Health probes: tcp, tls, head or get (get reads at most MAX_BODY bytes)
+    HEALTH_PROBE_TRAEFIK: str = "get"
+    HEALTH_PROBE_KVM: str = "get"
+    HEALTH_PROBE_OVERRIDES: str = ""  # e.g. "traefik-plex=head,kvm-office=tls"
+    HEALTH_PROBE_MAX_BODY: int = 4096
+
+    # /api/media/dashboard waits at most this long, then serves stale sections
+    MEDIA_DASHBOARD_DEADLINE_MS: int = 800
+
+    # API responses: compression in preference order ("br" needs the brotli package)
+    RESPONSE_COMPRESSION: str = "gzip"  # e.g. "br,gzip"; empty disables
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024  # bytes
+
+    # /api/stream Server-Sent Events
+    STREAM_HISTORY: int = 256  # recent events kept for Last-Event-ID resume
+    STREAM_QUEUE_SIZE: int = 64  # events a subscriber may lag before it is dropped
+    STREAM_KEEPALIVE: int = 15  # seconds between keepalive comments
 
     # Development
     DEBUG: bool = True
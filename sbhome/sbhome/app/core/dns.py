@@ -0,0 +1,189 @@
+"""
+Minimal non-blocking DNS resolver (A and CNAME) with TTL-honoring cache
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import random
+import struct
+import time
+
+from app.core.config import settings
+
+
+TYPE_A = 1
+TYPE_CNAME = 5
+RCODE_NXDOMAIN = 3
+
+
+class DNSError(Exception):
+    """DNS lookup failed (timeout, server failure, malformed reply)"""
+
+
+class NXDomain(DNSError):
+    """The name does not exist"""
+
+
+def _read_name(data: bytes, pos: int) -> Tuple[str, int]:
+    """Read a possibly compressed domain name, returns (name, next position)"""
+    labels = []
+    end = None
+    for _ in range(128):  # guard against pointer loops
+        length = data[pos]
+        if length == 0:
+            pos += 1
+            break
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = pos + 2
+            pos = struct.unpack_from("!H", data, pos)[0] & 0x3FFF
+            continue
+        labels.append(data[pos + 1:pos + 1 + length].decode("ascii", "replace"))
+        pos += 1 + length
+    return ".".join(labels), end if end is not None else pos
+
+
+def build_query(name: str, rtype: int) -> Tuple[int, bytes]:
+    """Build a recursive query packet, returns (query id, packet)"""
+    query_id = random.randint(0, 0xFFFF)
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    qname = b"".join(
+        bytes([len(label)]) + label.encode("ascii") for label in name.rstrip(".").split(".")
+    ) + b"\x00"
+    return query_id, header + qname + struct.pack("!HH", rtype, 1)
+
+
+def parse_response(data: bytes) -> Tuple[int, int, List[Dict[str, Any]]]:
+    """Parse a reply, returns (query id, rcode, answer records)"""
+    try:
+        query_id, flags, qdcount, ancount, _, _ = struct.unpack_from("!HHHHHH", data, 0)
+        pos = 12
+        for _ in range(qdcount):
+            _, pos = _read_name(data, pos)
+            pos += 4
+
+        answers = []
+        for _ in range(ancount):
+            name, pos = _read_name(data, pos)
+            rtype, _, ttl, rdlength = struct.unpack_from("!HHIH", data, pos)
+            pos += 10
+            if rtype == TYPE_A and rdlength == 4:
+                value = ".".join(str(b) for b in data[pos:pos + 4])
+            elif rtype == TYPE_CNAME:
+                value, _ = _read_name(data, pos)
+            else:
+                value = None
+            if value is not None:
+                answers.append({"name": name, "type": rtype, "value": value, "ttl": ttl})
+            pos += rdlength
+    except (struct.error, IndexError) as e:
+        raise DNSError(f"Malformed DNS response: {e}")
+
+    return query_id, flags & 0x000F, answers
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    """Sends one query and resolves with the matching reply"""
+
+    def __init__(self, query_id: int, packet: bytes):
+        self.query_id = query_id
+        self.packet = packet
+        self.reply: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def connection_made(self, transport):
+        transport.sendto(self.packet)
+
+    def datagram_received(self, data, addr):
+        if len(data) >= 2 and struct.unpack_from("!H", data)[0] == self.query_id:
+            if not self.reply.done():
+                self.reply.set_result(data)
+
+    def error_received(self, exc):
+        if not self.reply.done():
+            self.reply.set_exception(exc)
+
+
+def _system_nameserver() -> str:
+    """First nameserver from /etc/resolv.conf"""
+    try:
+        with open("/etc/resolv.conf") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return parts[1]
+    except OSError:
+        pass
+    return "127.0.0.1"
+
+
+class AsyncResolver:
+    """Resolves A records (and the CNAME chain in front of them) over UDP
+
+    Answers are cached for their DNS TTL; names that don't exist are
+    cached for negative_ttl seconds.
+    """
+
+    def __init__(
+        self,
+        nameserver: Optional[str] = None,
+        timeout: float = 2.0,
+        attempts: int = 2,
+        negative_ttl: int = 60
+    ):
+        self.nameserver = nameserver or _system_nameserver()
+        self.timeout = timeout
+        self.attempts = attempts
+        self.negative_ttl = negative_ttl
+        self._cache: Dict[str, Tuple[Optional[Dict[str, Any]], float]] = {}
+
+    async def _query(self, name: str, rtype: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """Send a query, retrying on timeout"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.attempts):
+            query_id, packet = build_query(name, rtype)
+            transport, protocol = await loop.create_datagram_endpoint(
+                lambda: _QueryProtocol(query_id, packet),
+                remote_addr=(self.nameserver, 53)
+            )
+            try:
+                data = await asyncio.wait_for(protocol.reply, self.timeout)
+            except asyncio.TimeoutError:
+                continue
+            finally:
+                transport.close()
+            _, rcode, answers = parse_response(data)
+            return rcode, answers
+        raise DNSError(f"Timed out resolving {name} via {self.nameserver}")
+
+    async def resolve(self, name: str) -> Dict[str, Any]:
+        """Resolve name to its addresses and first CNAME target
+
+        Returns {"addresses": [...], "cname": str or None, "ttl": seconds}.
+        Raises NXDomain if the name doesn't exist.
+        """
+        name = name.rstrip(".").lower()
+        cached = self._cache.get(name)
+        if cached is not None and time.monotonic() < cached[1]:
+            if cached[0] is None:
+                raise NXDomain(name)
+            return cached[0]
+
+        rcode, answers = await self._query(name, TYPE_A)
+        addresses = [a["value"] for a in answers if a["type"] == TYPE_A]
+        if rcode == RCODE_NXDOMAIN or (rcode == 0 and not addresses):
+            self._cache[name] = (None, time.monotonic() + self.negative_ttl)
+            raise NXDomain(name)
+        if rcode != 0:
+            raise DNSError(f"DNS error resolving {name}: rcode {rcode}")
+
+        cname = next(
+            (a["value"] for a in answers if a["type"] == TYPE_CNAME and a["name"].lower() == name),
+            None
+        )
+        ttl = max(min(a["ttl"] for a in answers), 1)
+        result = {"addresses": addresses, "cname": cname, "ttl": ttl}
+        self._cache[name] = (result, time.monotonic() + ttl)
+        return result
+
+
+# Global resolver
+resolver = AsyncResolver(nameserver=settings.DNS_SERVER or None)
@@ -0,0 +1,141 @@
+"""
+Change-only event bus feeding the dashboard's Server-Sent Events stream
+"""
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import json
+import time
+
+from app.core.cache import json_default
+from app.core.config import settings
+
+
+# (sequence number, section, serialized event data)
+Event = Tuple[int, str, str]
+
+
+class EventBus:
+    """Fans out changed dashboard sections to any number of subscribers
+
+    publish() serializes a section once and drops it if its content hash
+    is unchanged, so N open dashboards cost one refresh cycle and one
+    serialization. Recent events are kept for resuming with Last-Event-ID;
+    a cursor that is too old (or from a previous process) gets the latest
+    value of every section instead. Subscribers that fall queue_size events
+    behind are disconnected and resume the same way.
+    """
+
+    def __init__(self, history: int = 256, queue_size: int = 64):
+        self.queue_size = queue_size
+        self._boot = format(int(time.time()), "x")  # ids from older processes don't resume
+        self._seq = 0
+        self._hashes: Dict[str, str] = {}
+        self._latest: Dict[str, Event] = {}
+        self._history: Deque[Event] = deque(maxlen=history)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._stats = {
+            "published": 0,
+            "unchanged": 0,
+            "resumed": 0,
+            "snapshots": 0,
+            "dropped_subscribers": 0
+        }
+
+    def event_id(self, seq: int) -> str:
+        return f"{self._boot}-{seq}"
+
+    def _parse_id(self, event_id: Optional[str]) -> Optional[int]:
+        """Sequence number of an id issued by this process, else None"""
+        if not event_id:
+            return None
+        boot, _, seq = event_id.partition("-")
+        if boot != self._boot or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, section: str, value: Any, fingerprint: Any = None) -> bool:
+        """Publish a section if it changed, returns whether it was sent
+
+        fingerprint, if given, is hashed instead of the value (e.g. to
+        ignore timestamps that change on every check).
+        """
+        data = json.dumps({"section": section, "data": value}, default=json_default, separators=(",", ":"))
+        hashed = data if fingerprint is None else json.dumps(fingerprint, default=json_default, sort_keys=True)
+        digest = hashlib.blake2b(hashed.encode(), digest_size=16).hexdigest()
+        if self._hashes.get(section) == digest:
+            self._stats["unchanged"] += 1
+            return False
+
+        self._hashes[section] = digest
+        self._seq += 1
+        event = (self._seq, section, data)
+        self._history.append(event)
+        self._latest[section] = event
+        self._stats["published"] += 1
+
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(queue)
+        return True
+
+    def _drop(self, queue: asyncio.Queue):
+        """Disconnect a subscriber that fell too far behind"""
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+        self._stats["dropped_subscribers"] += 1
+
+    def _backlog(self, last_seq: Optional[int]) -> List[Event]:
+        """Events a subscriber missed, or a snapshot of every section"""
+        oldest = self._history[0][0] if self._history else self._seq + 1
+        if last_seq is not None and oldest - 1 <= last_seq <= self._seq:
+            self._stats["resumed"] += 1
+            return [event for event in self._history if event[0] > last_seq]
+        self._stats["snapshots"] += 1
+        return sorted(self._latest.values())
+
+    async def subscribe(
+        self,
+        last_event_id: Optional[str] = None,
+        keepalive: float = 15
+    ) -> AsyncIterator[Optional[Event]]:
+        """Yield missed events then live ones; None means "send a keepalive" """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            sent = 0
+            for event in self._backlog(self._parse_id(last_event_id)):
+                sent = event[0]
+                yield event
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return  # dropped for falling behind
+                if event[0] > sent:
+                    sent = event[0]
+                    yield event
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get publish and subscriber counters"""
+        return {
+            **self._stats,
+            "subscribers": len(self._subscribers),
+            "sections": len(self._latest),
+            "last_id": self.event_id(self._seq) if self._seq else None
+        }
+
+
+# Global event bus instance
+event_bus = EventBus(history=settings.STREAM_HISTORY, queue_size=settings.STREAM_QUEUE_SIZE)
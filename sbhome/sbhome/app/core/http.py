@@ -0,0 +1,103 @@
+"""
+Shared, long-lived HTTP clients per upstream
+"""
+from typing import Any, Dict
+import importlib.util
+
+import httpx
+
+from app.core.config import settings
+
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def error_summary(exc: BaseException) -> str:
+    """Client-safe description of an upstream error
+
+    httpx messages include the request URL, and some upstreams take their
+    API key as a query parameter, so only the error type (and status code)
+    leaves the server. Log str(exc) for the details.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        response = exc.response
+        return f"{type(exc).__name__}: {response.status_code} {response.reason_phrase}".rstrip()
+    return type(exc).__name__
+
+
+class HTTPClientRegistry:
+    """One keep-alive httpx.AsyncClient per upstream
+
+    Services register their upstream at import time; clients are opened in
+    the startup event and closed in the shutdown event, so every cache miss
+    reuses a warm connection instead of paying a new TCP/TLS handshake.
+    """
+
+    def __init__(self, http2: bool = False):
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._upstreams: Dict[str, Dict[str, Any]] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def register(
+        self,
+        name: str,
+        timeout: float = 10.0,
+        verify: bool = True,
+        max_connections: int = 10,
+        max_keepalive: int = 5
+    ):
+        """Declare an upstream and its connection settings"""
+        self._upstreams[name] = {
+            "timeout": timeout,
+            "verify": verify,
+            "max_connections": max_connections,
+            "max_keepalive": max_keepalive
+        }
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        """Build the client for a registered upstream"""
+        upstream = self._upstreams[name]
+        return httpx.AsyncClient(
+            timeout=upstream["timeout"],
+            verify=upstream["verify"],
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=upstream["max_connections"],
+                max_keepalive_connections=upstream["max_keepalive"]
+            )
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Get the shared client for an upstream, creating it if needed"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create(name)
+            self._clients[name] = client
+        return client
+
+    async def startup(self):
+        """Open clients for every registered upstream"""
+        for name in self._upstreams:
+            self.get(name)
+
+    async def shutdown(self):
+        """Close all clients"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get registered upstreams and their settings"""
+        return {
+            "http2": self.http2,
+            "upstreams": {
+                name: {**upstream, "open": name in self._clients}
+                for name, upstream in self._upstreams.items()
+            }
+        }
+
+
+# Global client registry
+http_clients = HTTPClientRegistry(http2=settings.HTTP2_ENABLED)
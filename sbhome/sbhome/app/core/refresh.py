@@ -0,0 +1,256 @@
+"""
+Background refresh scheduler that keeps cached data sources warm
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import functools
+import inspect
+import random
+import time
+
+from app.core.cache import SimpleCache, cache
+from app.core.events import event_bus
+
+
+class RefreshSource:
+    """A cached upstream data source and its refresh timings"""
+
+    def __init__(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        interval: float,
+        stale_ttl: Optional[float] = None,
+        publish: Optional[str] = None
+    ):
+        self.key = key
+        self.loader = loader
+        self.interval = interval
+        self._stale_ttl = stale_ttl
+        self.publish = publish  # event stream section fed by this source
+        self.refresh_count = 0
+        self.error_count = 0
+        self.consecutive_errors = 0
+        self.last_error: Optional[str] = None
+        self.last_refresh: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.total_duration_ms = 0.0
+        self.next_refresh: Optional[float] = None
+
+    @property
+    def stale_ttl(self) -> float:
+        """How long past expiry the last value may still be served"""
+        if self._stale_ttl is not None:
+            return self._stale_ttl
+        return self.interval * 5
+
+    async def load(self) -> Any:
+        """Run the loader, recording its timing"""
+        start = time.perf_counter()
+        try:
+            value = await self.loader()
+        except Exception as e:
+            self.error_count += 1
+            self.consecutive_errors += 1
+            self.last_error = str(e)
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.last_duration_ms = round(duration_ms, 1)
+            self.total_duration_ms += duration_ms
+            self.last_refresh = time.time()
+
+        self.refresh_count += 1
+        self.consecutive_errors = 0
+        self.last_error = None
+        if self.publish:
+            event_bus.publish(self.publish, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Get refresh timings for this source"""
+        calls = self.refresh_count + self.error_count
+        return {
+            "interval": self.interval,
+            "refresh_count": self.refresh_count,
+            "error_count": self.error_count,
+            "last_error": self.last_error,
+            "last_refresh": self.last_refresh,
+            "last_duration_ms": self.last_duration_ms,
+            "avg_duration_ms": round(self.total_duration_ms / calls, 1) if calls else None,
+            "next_refresh": self.next_refresh
+        }
+
+
+class RefreshScheduler:
+    """Refreshes registered sources ahead of their cache expiry
+
+    Each source is reloaded after 75-90% of its interval, so reads keep
+    hitting a fresh cache entry. Start times and periods are jittered so
+    sources don't all hit their upstreams at once, and failing sources back
+    off exponentially (capped at max_backoff).
+    """
+
+    def __init__(self, cache: SimpleCache, max_backoff: float = 300):
+        self.cache = cache
+        self.max_backoff = max_backoff
+        self._sources: Dict[str, RefreshSource] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running = False
+
+    def register(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        interval: float,
+        stale_ttl: Optional[float] = None,
+        publish: Optional[str] = None
+    ) -> RefreshSource:
+        """Add a source to keep warm"""
+        source = RefreshSource(key, loader, interval, stale_ttl, publish)
+        self._sources[key] = source
+        if self._running:
+            self._tasks[key] = asyncio.create_task(self._run(source))
+        return source
+
+    def register_service(self, service: Any):
+        """Register every @refreshable method of a service instance"""
+        for name, member in inspect.getmembers(type(service)):
+            spec = getattr(member, "refresh_spec", None)
+            if spec is None:
+                continue
+            key, interval, stale_ttl, publish, func = spec
+            signature = inspect.signature(func)
+            bound = signature.bind_partial(service)
+            bound.apply_defaults()
+            self.register(
+                key.format(**bound.arguments),
+                functools.partial(func, service),
+                interval,
+                stale_ttl,
+                publish.format(**bound.arguments) if publish else None
+            )
+
+    def source(self, key: str) -> Optional[RefreshSource]:
+        """Get a registered source"""
+        return self._sources.get(key)
+
+    def peek(self, method: Callable[..., Awaitable[Any]], *args, **kwargs) -> Optional[Tuple[Any, bool]]:
+        """(value, is_fresh) cached for a @refreshable bound method call, if any"""
+        key, _, _, _, func = method.__func__.refresh_spec
+        bound = inspect.signature(func).bind(method.__self__, *args, **kwargs)
+        bound.apply_defaults()
+        return self.cache.peek(key.format(**bound.arguments))
+
+    async def read(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        interval: float,
+        stale_ttl: Optional[float] = None
+    ) -> Any:
+        """Read a source through the cache, loading it on a miss"""
+        source = self._sources.get(key)
+        if source is None:
+            # Unregistered variant (e.g. non-default arguments): plain cache
+            return await self.cache.get_or_fetch(
+                key,
+                loader,
+                ttl=interval,
+                stale_ttl=stale_ttl if stale_ttl is not None else interval * 5
+            )
+        return await self.cache.get_or_fetch(key, source.load, *self._ttls(source))
+
+    async def refresh(self, key: str) -> Any:
+        """Reload a registered source now"""
+        source = self._sources[key]
+        return await self.cache.refresh(key, source.load, *self._ttls(source))
+
+    @staticmethod
+    def _ttls(source: RefreshSource) -> Tuple[Callable[[], float], Callable[[], float]]:
+        """Cache TTLs read after each load, so a loader may retune its own interval"""
+        return (lambda: source.interval), (lambda: source.stale_ttl)
+
+    async def push(self, key: str, value: Any):
+        """Store a value pushed by the upstream as if the source had just refreshed"""
+        source = self._sources[key]
+        await self.cache.set(key, value, ttl=source.interval, stale_ttl=source.stale_ttl)
+        if source.publish:
+            event_bus.publish(source.publish, value)
+
+    async def _run(self, source: RefreshSource):
+        """Refresh loop for one source"""
+        # Spread initial loads over the first few seconds
+        await asyncio.sleep(random.uniform(0, min(source.interval, 5)))
+        while self._running:
+            try:
+                await self.refresh(source.key)
+                delay = source.interval * random.uniform(0.75, 0.9)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if source.consecutive_errors == 1:
+                    print(f"Refresh error for {source.key}: {e}")
+                delay = min(
+                    source.interval * 2 ** source.consecutive_errors,
+                    self.max_backoff
+                )
+            source.next_refresh = time.time() + delay
+            await asyncio.sleep(delay)
+
+    def start(self):
+        """Start refresh loops for all registered sources"""
+        if self._running:
+            return
+        self._running = True
+        for key, source in self._sources.items():
+            self._tasks[key] = asyncio.create_task(self._run(source))
+
+    def stop(self):
+        """Stop all refresh loops"""
+        self._running = False
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-source refresh timings"""
+        return {key: source.stats() for key, source in self._sources.items()}
+
+
+# Global scheduler instance
+refresh_scheduler = RefreshScheduler(cache)
+
+
+def refreshable(
+    key: str,
+    interval: float,
+    stale_ttl: Optional[float] = None,
+    publish: Optional[str] = None
+):
+    """Declare a service method as a cached source kept warm in the background
+
+    key may reference the method's arguments, e.g. "radarr:queue:{page}";
+    the scheduler refreshes the variant built from the default arguments.
+    If publish names a section, each changed result is pushed to /api/stream.
+    Both may use attributes of self, e.g. "{self.name}:queue".
+    Register the service instance with refresh_scheduler.register_service().
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            return await refresh_scheduler.read(
+                key.format(**bound.arguments),
+                lambda: func(self, *args, **kwargs),
+                interval,
+                stale_ttl
+            )
+
+        wrapper.refresh_spec = (key, interval, stale_ttl, publish, func)
+        return wrapper
+
+    return decorator
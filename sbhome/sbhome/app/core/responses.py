@@ -0,0 +1,107 @@
+"""
+JSON responses from precomputed payloads, with ETag revalidation and compression
+"""
+from typing import Any, Optional
+import gzip
+import importlib.util
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.cache import Payload, cache, serialize
+from app.core.config import settings
+
+
+# Brotli needs the optional brotli package
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+ENCODINGS = [
+    e.strip() for e in settings.RESPONSE_COMPRESSION.split(",")
+    if e.strip() == "gzip" or (e.strip() == "br" and BROTLI_AVAILABLE)
+]
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=5, mtime=0)
+
+
+def _encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """Strong ETag of one representation: '"<hash>"' or '"<hash>-gzip"'"""
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches any representation of etag
+
+    Weak comparison, as RFC 9110 requires for If-None-Match: a W/ prefix
+    and the encoding suffix are ignored, since every encoding of a payload
+    is semantically the same.
+    """
+    if not if_none_match:
+        return False
+    variants = {_encoded_etag(etag, encoding) for encoding in (None, *ENCODINGS)}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") in variants:
+            return True
+    return False
+
+
+def _pick_encoding(accept_encoding: str) -> Optional[str]:
+    """First configured encoding the client accepts"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    for encoding in ENCODINGS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def json_response(request: Request, value: Any) -> Response:
+    """Send value as JSON, reusing the cache's serialized body when it holds value
+
+    Sets a strong ETag per representation (compressed bodies get an
+    encoding suffix) and answers a matching If-None-Match with 304.
+    Bodies of at least RESPONSE_COMPRESSION_MIN_SIZE bytes are compressed
+    once per payload for clients that accept it.
+    """
+    payload: Optional[Payload] = cache.payload(value) or serialize(value)
+    if payload is None:
+        return JSONResponse(jsonable_encoder(value))
+
+    body = payload.body
+    encoding = None
+    if len(body) >= settings.RESPONSE_COMPRESSION_MIN_SIZE:
+        encoding = _pick_encoding(request.headers.get("accept-encoding", ""))
+
+    headers = {
+        "ETag": _encoded_etag(payload.etag, encoding),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    if _not_modified(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        encoded = payload.variants.get(encoding)
+        if encoded is None:
+            encoded = payload.variants[encoding] = _compress(body, encoding)
+        body = encoded
+        headers["Content-Encoding"] = encoding
+
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,185 @@
+"""
+On-disk cache snapshot for warm starts
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+from app.core.cache import SimpleCache, cache
+from app.core.config import settings
+
+
+# Record classes that can round-trip through the snapshot, by name
+_RECORD_TYPES: Dict[str, type] = {}
+
+
+def snapshot_record(cls):
+    """Register a record class (with to_dict and keyword init) for snapshots"""
+    _RECORD_TYPES[cls.__name__] = cls
+    return cls
+
+
+def _encode(value: Any) -> Any:
+    """json.dumps default: tag registered records so load can rebuild them"""
+    name = type(value).__name__
+    if _RECORD_TYPES.get(name) is type(value):
+        return {"__record__": name, **value.to_dict()}
+    return str(value)
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    """json.loads object_hook: rebuild tagged records"""
+    name = obj.pop("__record__", None)
+    if name is None:
+        return obj
+    return _RECORD_TYPES[name](**obj)
+
+
+class CacheSnapshot:
+    """Periodically persists the cache to SQLite and restores it on startup
+
+    Restored entries are loaded as stale: they are served immediately and
+    the first read of each one triggers a background refresh.
+    """
+
+    def __init__(
+        self,
+        cache: SimpleCache,
+        path: str,
+        interval: int = 300,
+        max_age: int = 86400,
+        stale_ttl: int = 300
+    ):
+        self.cache = cache
+        self.path = path
+        self.interval = interval
+        self.max_age = max_age
+        self.stale_ttl = stale_ttl
+        self._task: Optional[asyncio.Task] = None
+        self._last_saved: Optional[float] = None
+        self._last_loaded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the snapshot database, creating it if needed"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_snapshot ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, saved_at REAL NOT NULL)"
+        )
+        return conn
+
+    def _write(self, rows: List[Tuple[str, str, float]]):
+        """Replace the stored snapshot with rows (runs in a worker thread)"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM cache_snapshot")
+                conn.executemany("INSERT INTO cache_snapshot VALUES (?, ?, ?)", rows)
+        finally:
+            conn.close()
+
+    def _read(self) -> List[Tuple[str, str, float]]:
+        """Read the stored snapshot (runs in a worker thread)"""
+        if not os.path.exists(self.path):
+            return []
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT key, value, saved_at FROM cache_snapshot").fetchall()
+        finally:
+            conn.close()
+
+    async def save(self) -> int:
+        """Write current cache contents to disk, returns number of entries"""
+        if not self.enabled:
+            return 0
+
+        now = time.time()
+        rows = []
+        for key, value in self.cache.items():
+            try:
+                rows.append((key, json.dumps(value, default=_encode), now))
+            except (TypeError, ValueError) as e:
+                print(f"Cache snapshot: skipping {key}: {e}")
+
+        await asyncio.to_thread(self._write, rows)
+        self._last_saved = now
+        return len(rows)
+
+    async def load(self) -> int:
+        """Restore entries from disk as stale, returns number of entries"""
+        if not self.enabled:
+            return 0
+
+        try:
+            rows = await asyncio.to_thread(self._read)
+        except sqlite3.Error as e:
+            print(f"Cache snapshot: could not read {self.path}: {e}")
+            return 0
+
+        now = time.time()
+        loaded = 0
+        for key, value, saved_at in rows:
+            if now - saved_at > self.max_age:
+                continue
+            try:
+                value = json.loads(value, object_hook=_decode)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Cache snapshot: skipping {key}: {e}")
+                continue
+            await self.cache.set_stale(key, value, stale_ttl=self.stale_ttl)
+            loaded += 1
+
+        self._last_loaded = loaded
+        return loaded
+
+    def start(self):
+        """Start periodic snapshot writes"""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._save_loop())
+
+    async def stop(self):
+        """Stop periodic writes and write a final snapshot"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.enabled:
+            count = await self.save()
+            print(f"Cache snapshot: saved {count} entries to {self.path}")
+
+    async def _save_loop(self):
+        """Background loop that writes the snapshot every interval"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except Exception as e:
+                print(f"Cache snapshot error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get snapshot status"""
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "last_saved": self._last_saved,
+            "entries_loaded": self._last_loaded
+        }
+
+
+# Global snapshot instance
+cache_snapshot = CacheSnapshot(
+    cache,
+    path=settings.CACHE_SNAPSHOT_PATH,
+    interval=settings.CACHE_SNAPSHOT_INTERVAL,
+    max_age=settings.CACHE_SNAPSHOT_MAX_AGE,
+    stale_ttl=settings.CACHE_SNAPSHOT_STALE_TTL
+)
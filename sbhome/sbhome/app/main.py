@@ -8,9 +8,14 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import os
 
-from app.api.routes import traefik, media, network, health, kvm
+from app.api.routes import traefik, media, network, health, kvm, stream
 from app.core.config import settings
+from app.core.cache import cache
+from app.core.snapshot import cache_snapshot
+from app.core.http import http_clients
+from app.core.refresh import refresh_scheduler
 from app.services.health_check_service import health_check_service
+from app.services.unifi_service import unifi_service
 
 app = FastAPI(
     title="sbHome API",
@@ -22,14 +27,28 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     """Start background services on application startup"""
+    await http_clients.startup()
+    if cache_snapshot.enabled:
+        restored = await cache_snapshot.load()
+        print(f"Restored {restored} cache entries from {cache_snapshot.path}")
+        cache_snapshot.start()
+    cache.start_sweeper(settings.CACHE_SWEEP_INTERVAL)
+    refresh_scheduler.start()
+    if settings.UNIFI_EVENTS_ENABLED:
+        unifi_service.events.start()
     await health_check_service.start_background_checks()
-    print("Background health checks started")
+    print("Background refresh and health checks started")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Stop background services on application shutdown"""
     health_check_service.stop()
-    print("Background health checks stopped")
+    refresh_scheduler.stop()
+    unifi_service.events.stop()
+    cache.stop_sweeper()
+    await cache_snapshot.stop()
+    await http_clients.shutdown()
+    print("Background refresh and health checks stopped")
 
 # CORS middleware for development
 app.add_middleware(
@@ -46,6 +65,7 @@ app.include_router(media.router, prefix="/api/media", tags=["media"])
 app.include_router(network.router, prefix="/api/network", tags=["network"])
 app.include_router(kvm.router, prefix="/api/kvm", tags=["kvm"])
 app.include_router(health.router, prefix="/api/health", tags=["health"])
+app.include_router(stream.router, prefix="/api/stream", tags=["stream"])
 
 # Serve static files (frontend)
 if os.path.exists("public"):
@@ -71,7 +91,8 @@ async def api_root():
             "traefik": "/api/traefik",
             "media": "/api/media",
             "network": "/api/network",
-            "health": "/api/health"
+            "health": "/api/health",
+            "stream": "/api/stream"
         }
     }
 
@@ -3,110 +3,343 @@ Health checking service for all dashboard items
 """
 import asyncio
 import httpx
-from typing import Dict, Any, List
+from collections import deque
+from typing import Dict, Any, List, Awaitable, Deque, Optional, Set, Tuple
 from datetime import datetime
+import random
 import socket
-import traceback
+import time
 
 from app.core.cache import cache
+from app.core.config import settings
+from app.core.events import event_bus
+from app.core.refresh import refresh_scheduler
+from app.services.health_probes import PROBE_MODES, probe_http, probe_tcp, probe_tls
+
+
+def _parse_overrides(value: str) -> Dict[str, str]:
+    """Parse "item-id=mode,item-id=mode" probe overrides"""
+    overrides = {}
+    for pair in value.split(","):
+        if "=" not in pair:
+            continue
+        item_id, mode = (part.strip() for part in pair.split("=", 1))
+        if mode in PROBE_MODES:
+            overrides[item_id] = mode
+        else:
+            print(f"Ignoring unknown health probe mode {mode!r} for {item_id}")
+    return overrides
+
+
+class TargetSchedule:
+    """When a single health target is next due, based on its recent history"""
+
+    def __init__(self, item_id: str, kind: str, target: Dict[str, Any], first_due: float):
+        self.item_id = item_id
+        self.kind = kind  # "traefik" or "kvm"
+        self.target = target
+        self.next_due = first_due
+        self.interval = 0.0
+        self.history: Deque[bool] = deque(maxlen=6)
+        self.in_flight = False
+
+    @property
+    def flapping(self) -> bool:
+        """Whether the target changed state within the recent history"""
+        results = list(self.history)
+        return any(a != b for a, b in zip(results, results[1:]))
 
 
 class HealthCheckService:
-    """Service for checking health of all dashboard items"""
+    """Service for checking health of all dashboard items
+
+    Each target is probed on its own schedule: stable healthy targets back
+    off from check_interval up to max_interval, while failing or flapping
+    targets are re-checked every 10-15 seconds.
+    """
 
     def __init__(self):
-        self.check_interval = 60  # seconds
+        self.check_interval = 60  # seconds, first interval for healthy targets
+        self.max_interval = 300  # seconds, backoff cap for stable targets
+        self.fast_interval = (10, 15)  # seconds, for failing/flapping targets
+        self.tick_interval = 5  # seconds between due-target scans
+        self.start_spread = 15  # seconds over which new targets are first checked
         self.timeout = 5  # seconds for each check
+        self.max_body = settings.HEALTH_PROBE_MAX_BODY  # bytes read by "get" probes
+        self.probe_modes = {
+            "traefik": settings.HEALTH_PROBE_TRAEFIK,
+            "kvm": settings.HEALTH_PROBE_KVM
+        }
+        self.probe_overrides = _parse_overrides(settings.HEALTH_PROBE_OVERRIDES)
         self._running = False
+        self._status: Dict[str, Dict[str, Any]] = {}  # item id -> latest result
+        self._schedules: Dict[str, TargetSchedule] = {}
+        self.min_sweep_gap = 30  # seconds between on-demand full sweeps
+        self._sweep_task: Optional[asyncio.Task] = None
+        self._last_sweep: Optional[float] = None
+        self._sweep_stats = {
+            "started": 0,
+            "failed": 0,
+            "coalesced": 0,
+            "throttled": 0,
+            "last_duration_ms": None,
+            "total_duration_ms": 0.0
+        }
+        self._last_persist = 0.0
 
     async def start_background_checks(self):
         """Start background health checking loop"""
         if self._running:
             return
 
+        if not self._status:
+            # Seed from a restored snapshot so the first persist doesn't
+            # overwrite it with an empty map
+            cached = cache.peek("health_status")
+            if cached is not None:
+                self._status = dict(cached[0])
+
         self._running = True
         asyncio.create_task(self._check_loop())
 
     async def _check_loop(self):
-        """Background loop that runs health checks every 60 seconds"""
+        """Background loop that probes each target when it is due"""
+        sem = asyncio.Semaphore(10)  # Max 10 concurrent checks
         while self._running:
             try:
-                await self.check_all_health()
+                await self._sync_targets()
+
+                now = time.monotonic()
+                for schedule in self._schedules.values():
+                    if schedule.next_due <= now and not schedule.in_flight:
+                        schedule.in_flight = True
+                        asyncio.create_task(self._run_scheduled(sem, schedule))
+
+                if self._status and now - self._last_persist >= self.check_interval:
+                    # Persist for warm starts
+                    await cache.set("health_status", self._status, ttl=120)
+                    self._last_persist = now
             except Exception as e:
                 print(f"Health check error: {e}")
 
-            await asyncio.sleep(self.check_interval)
+            await asyncio.sleep(self.tick_interval)
+
+    async def _sync_targets(self):
+        """Add schedules for new targets and drop ones that went away"""
+        traefik_targets, kvm_targets = await self._list_targets(fetch=False)
+
+        now = time.monotonic()
+        for kind, targets in (("traefik", traefik_targets), ("kvm", kvm_targets)):
+            if targets is None:
+                # Listing failed: keep what we have
+                continue
+            for item_id, target in targets.items():
+                schedule = self._schedules.get(item_id)
+                if schedule is None:
+                    first_due = now + random.uniform(0, self.start_spread)
+                    self._schedules[item_id] = TargetSchedule(item_id, kind, target, first_due)
+                else:
+                    schedule.target = target
+            self._prune(kind, set(targets))
+
+    def _prune(self, kind: str, ids: Set[str]):
+        """Forget targets of a kind that are no longer listed"""
+        for item_id in [i for i, s in self._schedules.items() if s.kind == kind and i not in ids]:
+            del self._schedules[item_id]
+        removed = [i for i, item in self._status.items() if item.get("type") == kind and i not in ids]
+        if removed:
+            self._status = {i: item for i, item in self._status.items() if i not in removed}
+            for item_id in removed:
+                event_bus.publish(f"health:{item_id}", None)
+
+    async def _run_scheduled(self, sem: asyncio.Semaphore, schedule: TargetSchedule):
+        """Probe one scheduled target"""
+        try:
+            await self._run_check(sem, self._check_target(schedule.kind, schedule.target))
+        finally:
+            schedule.in_flight = False
+
+    def _reschedule(self, result: Dict[str, Any]):
+        """Pick the next check time for a target from its latest result"""
+        schedule = self._schedules.get(result["id"])
+        if schedule is None:
+            return
+
+        schedule.history.append(result["healthy"])
+        if not result["healthy"] or schedule.flapping:
+            schedule.interval = random.uniform(*self.fast_interval)
+        elif schedule.interval < self.check_interval:
+            schedule.interval = self.check_interval
+        else:
+            schedule.interval = min(schedule.interval * 2, self.max_interval)
 
-    async def check_all_health(self):
-        """Check health of all services and store results"""
+        schedule.next_due = time.monotonic() + schedule.interval * random.uniform(0.9, 1.1)
+
+    async def _list_targets(
+        self,
+        fetch: bool = True
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Get Traefik and KVM targets by item id (None if a listing failed)
+
+        With fetch=False only values the refresh scheduler already holds are
+        used, so the check loop never calls an upstream itself (and never
+        bypasses the scheduler's backoff); a listing with nothing cached
+        counts as failed.
+        """
         # Import services here to avoid circular imports
         from app.services.traefik_service import traefik_service
         from app.services.kvm_service import kvm_service
 
-        results = {}
-
-        # Check Traefik services
-        try:
-            services_data = await traefik_service.get_services()
-            services = services_data.get("services", [])
-            print(f"Health check: Got {len(services)} Traefik services to check")
-
-            # Check each service in parallel (limited concurrency)
-            tasks = []
-            for service in services:
-                tasks.append(self._check_service(service))
-
-            # Run checks with limited concurrency
-            sem = asyncio.Semaphore(10)  # Max 10 concurrent checks
-            async def bounded_check(task):
-                async with sem:
-                    return await task
-
-            service_results = await asyncio.gather(
-                *[bounded_check(task) for task in tasks],
-                return_exceptions=True
+        if not fetch:
+            traefik_cached = refresh_scheduler.peek(traefik_service.get_services)
+            kvm_cached = refresh_scheduler.peek(kvm_service.get_kvm_devices)
+            return (
+                self._traefik_targets(traefik_cached[0]) if traefik_cached is not None else None,
+                self._kvm_targets(kvm_cached[0]) if kvm_cached is not None else None
             )
 
-            for result in service_results:
-                if isinstance(result, dict):
-                    results[result["id"]] = result
-        except Exception as e:
-            print(f"Error checking Traefik services: {e}")
-            traceback.print_exc()
+        traefik_result, kvm_result = await asyncio.gather(
+            traefik_service.get_services(),
+            kvm_service.get_kvm_devices(),
+            return_exceptions=True
+        )
 
-        # Check KVM devices
-        try:
-            kvm_devices = await kvm_service.get_kvm_devices()
-            kvm_tasks = [self._check_kvm(device) for device in kvm_devices]
-            kvm_results = await asyncio.gather(*kvm_tasks, return_exceptions=True)
+        traefik_targets = None
+        if isinstance(traefik_result, Exception):
+            print(f"Error checking Traefik services: {traefik_result}")
+        else:
+            traefik_targets = self._traefik_targets(traefik_result)
 
-            for result in kvm_results:
-                if isinstance(result, dict):
-                    results[result["id"]] = result
-        except Exception as e:
-            print(f"Error checking KVM devices: {e}")
+        kvm_targets = None
+        if isinstance(kvm_result, Exception):
+            print(f"Error checking KVM devices: {kvm_result}")
+        else:
+            kvm_targets = self._kvm_targets(kvm_result)
+
+        return traefik_targets, kvm_targets
+
+    @staticmethod
+    def _traefik_targets(services: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            f"traefik-{service.get('name', 'unknown')}": service
+            for service in services.get("services", [])
+        }
+
+    @staticmethod
+    def _kvm_targets(devices: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            f"kvm-{device.get('location', 'unknown')}": device
+            for device in devices
+        }
+
+    def request_sweep(self) -> Optional[asyncio.Task]:
+        """Start a full sweep unless one is running or one finished too recently
+
+        Returns the in-flight sweep to wait on, or None when throttled.
+        """
+        if self._sweep_task is not None and not self._sweep_task.done():
+            self._sweep_stats["coalesced"] += 1
+            return self._sweep_task
+
+        if self._last_sweep is not None and time.monotonic() - self._last_sweep < self.min_sweep_gap:
+            self._sweep_stats["throttled"] += 1
+            return None
 
-        # Store all results in cache
-        await cache.set("health_status", results, ttl=120)  # Cache for 2 minutes
+        self._sweep_stats["started"] += 1
+        self._sweep_task = asyncio.create_task(self._sweep())
+        return self._sweep_task
 
-        return results
+    async def check_all_health(self):
+        """Check health of every target, joining a sweep already in flight"""
+        task = self.request_sweep()
+        if task is not None:
+            await asyncio.shield(task)
+        return self._status
+
+    async def _sweep(self):
+        """Check health of every target now, recording each result as it finishes"""
+        start = time.perf_counter()
+        try:
+            await self._run_sweep()
+        except Exception as e:
+            self._sweep_stats["failed"] += 1
+            print(f"Health sweep error: {e}")
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self._sweep_stats["last_duration_ms"] = round(duration_ms, 1)
+            self._sweep_stats["total_duration_ms"] += duration_ms
+            self._last_sweep = time.monotonic()
+
+    async def _run_sweep(self):
+        """Probe every listed target concurrently"""
+        traefik_targets, kvm_targets = await self._list_targets()
+
+        # Traefik and KVM targets are checked concurrently, sharing one limit
+        sem = asyncio.Semaphore(10)  # Max 10 concurrent checks
+        checks = []
+        for kind, targets in (("traefik", traefik_targets), ("kvm", kvm_targets)):
+            for item_id, target in (targets or {}).items():
+                schedule = self._schedules.get(item_id)
+                if schedule is None:
+                    checks.append(self._run_check(sem, self._check_target(kind, target)))
+                elif not schedule.in_flight:
+                    # Already being probed by the check loop otherwise
+                    schedule.in_flight = True
+                    schedule.target = target
+                    checks.append(self._run_scheduled(sem, schedule))
+        await asyncio.gather(*checks)
+
+        # Drop items that are no longer listed (only for groups that listed OK)
+        if traefik_targets is not None:
+            self._prune("traefik", set(traefik_targets))
+        if kvm_targets is not None:
+            self._prune("kvm", set(kvm_targets))
+
+        # Persist for warm starts
+        if self._status:
+            await cache.set("health_status", self._status, ttl=120)  # Cache for 2 minutes
+
+    def _check_target(self, kind: str, target: Dict[str, Any]) -> Awaitable[Dict[str, Any]]:
+        """Build the check coroutine for a target"""
+        if kind == "kvm":
+            return self._check_kvm(target)
+        return self._check_service(target)
+
+    async def _run_check(self, sem: asyncio.Semaphore, check: Awaitable[Dict[str, Any]]):
+        """Run one check under the concurrency limit and record its result"""
+        async with sem:
+            try:
+                result = await check
+            except Exception as e:
+                print(f"Health check error: {e}")
+                return
+        self._record(result)
+
+    def _record(self, result: Dict[str, Any]):
+        """Publish one result without disturbing readers of the current map"""
+        self._status = {**self._status, result["id"]: result}
+        self._reschedule(result)
+        # Push state changes only, not every re-check of a stable target
+        event_bus.publish(f"health:{result['id']}", result, fingerprint={
+            field: result.get(field) for field in ("healthy", "status_code", "error", "cert_days_left")
+        })
+
+    def _probe_mode(self, item_id: str, kind: str) -> str:
+        """Probe mode for a target: per-item override, else the kind default"""
+        mode = self.probe_overrides.get(item_id)
+        if mode is None:
+            mode = self.probe_modes.get(kind, "get")
+        return mode
 
     async def _check_service(self, service: Dict[str, Any]) -> Dict[str, Any]:
         """Check health of a single Traefik service"""
         service_id = f"traefik-{service.get('name', 'unknown')}"
         url = service.get('public_url', '')
 
-        status = await self._check_url(url, allow_redirects=True)
+        mode = self._probe_mode(service_id, "traefik")
+        status = await self._check_url(url, allow_redirects=True, mode=mode)
 
-        return {
-            "id": service_id,
-            "type": "traefik",
-            "name": service.get("name"),
-            "healthy": status["healthy"],
-            "status_code": status.get("status_code"),
-            "response_time_ms": status.get("response_time_ms"),
-            "last_checked": datetime.utcnow().isoformat()
-        }
+        return self._result(service_id, "traefik", service.get("name"), mode, status)
 
     async def _check_kvm(self, device: Dict[str, Any]) -> Dict[str, Any]:
         """Check health of a KVM device"""
@@ -114,64 +347,105 @@ class HealthCheckService:
         url = device.get('url', '')
 
         # KVM devices may have self-signed certs, so we allow that
-        status = await self._check_url(url, allow_redirects=False, verify_ssl=False)
+        mode = self._probe_mode(device_id, "kvm")
+        status = await self._check_url(url, allow_redirects=False, verify_ssl=False, mode=mode)
 
-        return {
-            "id": device_id,
-            "type": "kvm",
-            "name": device.get("name"),
+        return self._result(device_id, "kvm", device.get("name"), mode, status)
+
+    def _result(
+        self,
+        item_id: str,
+        kind: str,
+        name: Optional[str],
+        mode: str,
+        status: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the stored health item for a probe result"""
+        result = {
+            "id": item_id,
+            "type": kind,
+            "name": name,
             "healthy": status["healthy"],
             "status_code": status.get("status_code"),
             "response_time_ms": status.get("response_time_ms"),
-            "last_checked": datetime.utcnow().isoformat()
+            "probe": mode,
+            "timings": status.get("timings", {}),
+            "last_checked": datetime.utcnow().isoformat(),
+            "checked_at": time.time()
         }
+        for field in ("error", "bytes_read", "cert_expires", "cert_days_left"):
+            if field in status:
+                result[field] = status[field]
+        return result
 
     async def _check_url(
         self,
         url: str,
         allow_redirects: bool = True,
-        verify_ssl: bool = False
+        verify_ssl: bool = False,
+        mode: str = "get"
     ) -> Dict[str, Any]:
-        """Check if a URL is reachable"""
+        """Check if a URL is reachable using the given probe mode"""
         if not url:
             return {"healthy": False, "error": "No URL provided"}
 
         try:
-            start_time = asyncio.get_event_loop().time()
-
-            async with httpx.AsyncClient(
-                timeout=self.timeout,
-                verify=verify_ssl,
-                follow_redirects=allow_redirects
-            ) as client:
-                response = await client.get(url)
-
-                end_time = asyncio.get_event_loop().time()
-                response_time = int((end_time - start_time) * 1000)
-
-                # Consider 2xx and 3xx as healthy
-                healthy = 200 <= response.status_code < 400
-
-                return {
-                    "healthy": healthy,
-                    "status_code": response.status_code,
-                    "response_time_ms": response_time
-                }
-        except httpx.TimeoutException:
+            if mode == "tcp":
+                status = await probe_tcp(url, self.timeout)
+            elif mode == "tls":
+                status = await probe_tls(url, self.timeout, verify=verify_ssl)
+            else:
+                status = await probe_http(
+                    url,
+                    self.timeout,
+                    method="HEAD" if mode == "head" else "GET",
+                    allow_redirects=allow_redirects,
+                    verify=verify_ssl,
+                    max_body=self.max_body
+                )
+            status["response_time_ms"] = int(status["timings"]["total_ms"])
+            return status
+        except (httpx.TimeoutException, asyncio.TimeoutError):
             return {"healthy": False, "error": "Timeout"}
-        except httpx.ConnectError:
+        except (httpx.ConnectError, ConnectionError):
             return {"healthy": False, "error": "Connection refused"}
         except Exception as e:
             return {"healthy": False, "error": str(e)}
 
     async def get_health_status(self) -> Dict[str, Any]:
-        """Get cached health status for all services"""
-        status = await cache.get("health_status")
-        if status is None:
-            # If no cached status, trigger a check and return empty for now
-            asyncio.create_task(self.check_all_health())
-            return {}
-        return status
+        """Get latest health status for all items, with each item's age"""
+        status = self._status
+        if not status:
+            # Seed from a restored snapshot if there is one
+            cached = cache.peek("health_status")
+            if cached is not None:
+                status = self._status = cached[0]
+
+        if not status:
+            # Nothing known yet: check everything now rather than waiting
+            # for the staggered schedule
+            self.request_sweep()
+
+        now = time.time()
+        result = {}
+        for item_id, item in status.items():
+            schedule = self._schedules.get(item_id)
+            result[item_id] = {
+                **item,
+                "age_seconds": round(now - item.get("checked_at", now), 1),
+                "check_interval": round(schedule.interval, 1) if schedule else None
+            }
+        return result
+
+    def sweep_stats(self) -> Dict[str, Any]:
+        """Get full-sweep counters and durations"""
+        stats = dict(self._sweep_stats)
+        completed = stats["started"] - (1 if self._sweep_task and not self._sweep_task.done() else 0)
+        total = stats.pop("total_duration_ms")
+        stats["in_flight"] = self._sweep_task is not None and not self._sweep_task.done()
+        stats["avg_duration_ms"] = round(total / completed, 1) if completed else None
+        stats["targets_scheduled"] = len(self._schedules)
+        return stats
 
     def stop(self):
         """Stop background health checks"""
@@ -0,0 +1,192 @@
+"""
+Health probe implementations with per-phase timings
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import ssl
+import time
+
+import httpx
+
+
+PROBE_MODES = ("tcp", "tls", "head", "get")
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _host_port(url: str) -> Tuple[str, int, bool]:
+    """Split a URL into host, port and whether it uses TLS"""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    return parts.hostname or "", parts.port or (443 if secure else 80), secure
+
+
+def _no_verify_context() -> ssl.SSLContext:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+# Built once: loading the CA store costs tens of milliseconds per context
+_VERIFY_CONTEXT = ssl.create_default_context()
+_NO_VERIFY_CONTEXT = _no_verify_context()
+
+
+def _tls_context(verify: bool) -> ssl.SSLContext:
+    return _VERIFY_CONTEXT if verify else _NO_VERIFY_CONTEXT
+
+
+def _der_read(data: bytes, pos: int) -> Tuple[int, int, int]:
+    """Read one DER header, returns (tag, content start, content end)"""
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        count = length & 0x7F
+        length = int.from_bytes(data[pos:pos + count], "big")
+        pos += count
+    return tag, pos, pos + length
+
+
+def cert_not_after(der: bytes) -> Optional[datetime]:
+    """Extract notAfter from a DER certificate
+
+    getpeercert() only returns parsed fields for verified certificates, and
+    KVMs use self-signed ones, so walk just enough ASN.1 to reach validity.
+    """
+    try:
+        _, pos, _ = _der_read(der, 0)  # Certificate
+        _, pos, _ = _der_read(der, pos)  # TBSCertificate
+        tag, start, end = _der_read(der, pos)
+        if tag == 0xA0:  # [0] version is optional
+            pos = end
+        for _ in range(3):  # serialNumber, signature, issuer
+            _, _, pos = _der_read(der, pos)
+        _, pos, _ = _der_read(der, pos)  # validity
+        _, _, pos = _der_read(der, pos)  # notBefore
+        tag, start, end = _der_read(der, pos)  # notAfter
+        value = der[start:end].decode("ascii")
+        fmt = "%y%m%d%H%M%SZ" if tag == 0x17 else "%Y%m%d%H%M%SZ"
+        return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+    except (IndexError, ValueError):
+        return None
+
+
+def _cert_fields(ssl_object: Optional[ssl.SSLObject]) -> Dict[str, Any]:
+    """Certificate expiry fields for a completed handshake"""
+    if ssl_object is None:
+        return {}
+    der = ssl_object.getpeercert(binary_form=True)
+    expires = cert_not_after(der) if der else None
+    if expires is None:
+        return {}
+    days_left = (expires - datetime.now(timezone.utc)).total_seconds() / 86400
+    return {
+        "cert_expires": expires.isoformat(),
+        "cert_days_left": round(days_left, 1)
+    }
+
+
+async def probe_tcp(url: str, timeout: float) -> Dict[str, Any]:
+    """Connect only"""
+    host, port, _ = _host_port(url)
+    start = time.perf_counter()
+    _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    connect_ms = _elapsed_ms(start)
+    writer.close()
+
+    return {
+        "healthy": True,
+        "timings": {"connect_ms": connect_ms, "total_ms": connect_ms}
+    }
+
+
+async def probe_tls(url: str, timeout: float, verify: bool = False) -> Dict[str, Any]:
+    """Connect and complete a TLS handshake, capturing certificate expiry"""
+    host, port, _ = _host_port(url)
+    context = _tls_context(verify)
+    start = time.perf_counter()
+    _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        connect_ms = _elapsed_ms(start)
+        tls_start = time.perf_counter()
+        await asyncio.wait_for(
+            writer.start_tls(context, server_hostname=host),
+            timeout
+        )
+        tls_ms = _elapsed_ms(tls_start)
+        cert = _cert_fields(writer.get_extra_info("ssl_object"))
+    finally:
+        writer.close()
+
+    return {
+        "healthy": True,
+        "timings": {"connect_ms": connect_ms, "tls_ms": tls_ms, "total_ms": _elapsed_ms(start)},
+        **cert
+    }
+
+
+async def probe_http(
+    url: str,
+    timeout: float,
+    method: str = "GET",
+    allow_redirects: bool = True,
+    verify: bool = False,
+    max_body: int = 4096
+) -> Dict[str, Any]:
+    """HEAD or GET with a capped body read and per-phase timings"""
+    marks: Dict[str, float] = {}
+    cert: Dict[str, Any] = {}
+
+    async def trace(event: str, info: Dict[str, Any]):
+        # Keep the first occurrence of each phase (redirects repeat them)
+        if event not in marks:
+            marks[event] = time.perf_counter()
+        if event == "connection.start_tls.complete" and not cert:
+            stream = info.get("return_value")
+            if stream is not None:
+                cert.update(_cert_fields(stream.get_extra_info("ssl_object")))
+
+    body_bytes = 0
+    async with httpx.AsyncClient(
+        timeout=timeout,
+        verify=_tls_context(verify),
+        follow_redirects=allow_redirects
+    ) as client:
+        start = time.perf_counter()
+        async with client.stream(method, url, extensions={"trace": trace}) as response:
+            ttfb_ms = _elapsed_ms(start)
+            if method == "GET" and max_body > 0:
+                async for chunk in response.aiter_raw():
+                    body_bytes += len(chunk)
+                    if body_bytes >= max_body:
+                        break
+
+    timings = {"ttfb_ms": ttfb_ms, "total_ms": _elapsed_ms(start)}
+    if "connection.connect_tcp.started" in marks and "connection.connect_tcp.complete" in marks:
+        timings["connect_ms"] = round(
+            (marks["connection.connect_tcp.complete"] - marks["connection.connect_tcp.started"]) * 1000, 1
+        )
+    if "connection.start_tls.started" in marks and "connection.start_tls.complete" in marks:
+        timings["tls_ms"] = round(
+            (marks["connection.start_tls.complete"] - marks["connection.start_tls.started"]) * 1000, 1
+        )
+
+    status_code = response.status_code
+    healthy = 200 <= status_code < 400
+    if method == "HEAD" and status_code in (405, 501):
+        # Server is up, it just doesn't implement HEAD
+        healthy = True
+
+    return {
+        "healthy": healthy,
+        "status_code": status_code,
+        "bytes_read": body_bytes,
+        "timings": timings,
+        **cert
+    }
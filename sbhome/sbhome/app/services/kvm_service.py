@@ -1,11 +1,11 @@
 """
 KVM device discovery service
 """
-import socket
-import subprocess
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Optional
 
-from app.core.cache import cache
+from app.core.dns import NXDomain, resolver
+from app.core.refresh import refreshable, refresh_scheduler
 
 
 class KVMService:
@@ -14,51 +14,40 @@ class KVMService:
     KVM_LOCATIONS = ["office", "family-room", "laundry", "garage"]
     DNS_DOMAIN = "isnadboy.com"
 
+    # Records are cached by the resolver for their DNS TTL, so most
+    # refreshes don't touch the network
+    @refreshable("kvm:devices", interval=60)
     async def get_kvm_devices(self) -> List[Dict[str, Any]]:
         """Get all KVM devices from DNS"""
-        cache_key = "kvm:devices"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
-        devices = []
-        for location in self.KVM_LOCATIONS:
-            hostname = f"host-kvm-{location}.{self.DNS_DOMAIN}"
-
-            try:
-                # Get IP address
-                ip = socket.gethostbyname(hostname)
-
-                # Try to get CNAME (actual target)
-                try:
-                    result = subprocess.run(
-                        ["dig", "+short", hostname, "CNAME"],
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    cname = result.stdout.strip().rstrip('.') if result.returncode == 0 else None
-                except:
-                    cname = None
-
-                devices.append({
-                    "name": f"KVM - {location.replace('-', ' ').title()}",
-                    "hostname": hostname,
-                    "ip": ip,
-                    "cname": cname,
-                    "location": location,
-                    "url": f"https://{hostname}"
-                })
-            except socket.gaierror:
-                # DNS lookup failed - device doesn't exist
-                continue
-            except Exception as e:
-                # Other error - log but continue
-                print(f"Error resolving {hostname}: {e}")
-                continue
-
-        await cache.set(cache_key, devices, ttl=300)  # Cache for 5 minutes
-        return devices
+        results = await asyncio.gather(
+            *[self._resolve_location(location) for location in self.KVM_LOCATIONS]
+        )
+        return [device for device in results if device is not None]
+
+    async def _resolve_location(self, location: str) -> Optional[Dict[str, Any]]:
+        """Look up one KVM location's address and CNAME target"""
+        hostname = f"host-kvm-{location}.{self.DNS_DOMAIN}"
+
+        try:
+            record = await resolver.resolve(hostname)
+        except NXDomain:
+            # DNS lookup failed - device doesn't exist
+            return None
+        except Exception as e:
+            # Other error - log but continue
+            print(f"Error resolving {hostname}: {e}")
+            return None
+
+        return {
+            "name": f"KVM - {location.replace('-', ' ').title()}",
+            "hostname": hostname,
+            "ip": record["addresses"][0],
+            "cname": record["cname"],
+            "location": location,
+            "url": f"https://{hostname}"
+        }
 
 
 kvm_service = KVMService()
+
+refresh_scheduler.register_service(kvm_service)
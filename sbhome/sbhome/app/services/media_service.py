@@ -1,137 +1,338 @@
 """
 Media services (Tautulli, Radarr, SABnzbd, Overseerr)
 """
-import httpx
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import time
 
 from app.core.config import settings
-from app.core.cache import cache
+from app.core.refresh import refreshable, refresh_scheduler
+from app.core.http import error_summary, http_clients
+from app.services.tautulli_sessions import SessionTable
 
 
 class TautulliService:
     """Tautulli/Plex statistics service"""
 
+    def __init__(self):
+        self.window = 24 * 3600  # seconds of recently added episodes to keep
+        self.page_size = 50
+        self.max_pages = 20  # per refresh
+        self._recent: Dict[str, Dict[str, Any]] = {}  # rating_key -> episode
+        self._watermark = 0  # newest added_at seen
+        self.sessions = SessionTable()
+        self.poll_interval = 10  # seconds, matches get_activity's interval
+        self.reconcile_interval = settings.TAUTULLI_RECONCILE_INTERVAL
+        self._last_webhook: Optional[float] = None  # monotonic
+
+    @property
+    def configured(self) -> bool:
+        return bool(settings.TAUTULLI_URL)
+
+    @refreshable("tautulli:activity", interval=10, publish="streams")
     async def get_activity(self) -> Dict[str, Any]:
-        """Get current Plex activity"""
-        cache_key = "tautulli:activity"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
+        """Get current Plex activity
 
+        Polls every 10s until Tautulli webhooks arrive; after that the
+        session table is updated by webhooks and this poll only reconciles
+        it every reconcile_interval seconds. If no webhook arrives for
+        2 x reconcile_interval, normal polling resumes.
+        """
         url = f"{settings.TAUTULLI_URL}/api/v2"
         params = {
             "apikey": settings.TAUTULLI_API_KEY,
             "cmd": "get_activity"
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-        result = {
-            "stream_count": data.get("response", {}).get("data", {}).get("stream_count", 0),
-            "sessions": data.get("response", {}).get("data", {}).get("sessions", [])
-        }
-
-        await cache.set(cache_key, result, ttl=10)
-        return result
-
-    async def get_recently_added(self, count: int = 50) -> List[Dict[str, Any]]:
-        """Get recently added episodes from today"""
-        cache_key = f"tautulli:recently_added:{count}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
+        generation = self.sessions.generation
+        client = http_clients.get("tautulli")
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+
+        self.sessions.reconcile(data.get("response", {}).get("data", {}).get("sessions", []), generation)
+
+        source = refresh_scheduler.source("tautulli:activity")
+        if (
+            source is not None
+            and source.interval != self.poll_interval
+            and (self._last_webhook is None or time.monotonic() - self._last_webhook > 2 * self.reconcile_interval)
+        ):
+            # Webhooks stopped (notifier removed, token rotated): poll normally again
+            print("Tautulli webhooks stopped, resuming activity polling")
+            source.interval = self.poll_interval
+        return self._activity()
+
+    def _activity(self) -> Dict[str, Any]:
+        """Activity view of the session table"""
+        sessions = self.sessions.sessions()
+        return {"stream_count": len(sessions), "sessions": sessions}
+
+    async def handle_webhook(self, payload: Dict[str, Any]) -> bool:
+        """Apply a Tautulli webhook and push the new activity, returns whether it changed"""
+        self._last_webhook = time.monotonic()
+        source = refresh_scheduler.source("tautulli:activity")
+        if source is not None and source.interval != self.reconcile_interval:
+            # Webhooks are flowing: polling is only needed to reconcile
+            source.interval = self.reconcile_interval
+
+        changed = self.sessions.apply(payload)
+        if changed and source is not None:
+            await refresh_scheduler.push("tautulli:activity", self._activity())
+        return changed
+
+    async def _recently_added_page(self, start: int) -> List[Dict[str, Any]]:
+        """Fetch one newest-first page of recently added items"""
         url = f"{settings.TAUTULLI_URL}/api/v2"
         params = {
             "apikey": settings.TAUTULLI_API_KEY,
             "cmd": "get_recently_added",
-            "count": count
+            "count": self.page_size,
+            "start": start
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-        # Filter for today's episodes
-        yesterday_timestamp = int((datetime.now() - timedelta(days=1)).timestamp())
-        episodes = []
-
-        for item in data.get("response", {}).get("data", {}).get("recently_added", []):
-            if item.get("media_type") == "episode" and item.get("added_at", 0) >= yesterday_timestamp:
-                episodes.append({
-                    "title": item.get("grandparent_title"),
-                    "episode_title": item.get("title"),
-                    "season": item.get("parent_media_index"),
-                    "episode": item.get("media_index"),
-                    "season_episode": f"S{str(item.get('parent_media_index', 0)).zfill(2)}E{str(item.get('media_index', 0)).zfill(2)}"
-                })
-
-        await cache.set(cache_key, episodes, ttl=300)  # 5 minutes
-        return episodes
-
-
-class RadarrService:
-    """Radarr movie management service"""
-
+        client = http_clients.get("tautulli")
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+        return data.get("response", {}).get("data", {}).get("recently_added", [])
+
+    @refreshable("tautulli:recently_added", interval=120)
+    async def get_recently_added(self) -> List[Dict[str, Any]]:
+        """Get episodes added in the last 24 hours
+
+        Episodes are kept in a rolling window keyed by rating_key. Each
+        refresh pages newest-first only until it reaches the newest
+        added_at seen before (or the window start), then evicts episodes
+        that have aged out, so busy days are complete and quiet ones cost
+        a single page. If max_pages runs out first, the watermark is left
+        where it was so the next refresh covers the gap again.
+        """
+        cutoff = int(time.time()) - self.window
+        stop_at = max(self._watermark, cutoff)
+        newest = self._watermark
+        complete = False
+
+        for page in range(self.max_pages):
+            items = await self._recently_added_page(page * self.page_size)
+            reached = False
+            for item in items:
+                added_at = int(item.get("added_at") or 0)
+                if added_at < stop_at:
+                    reached = True
+                    break
+                newest = max(newest, added_at)
+                if item.get("media_type") == "episode":
+                    self._recent[str(item.get("rating_key"))] = {
+                        "title": item.get("grandparent_title"),
+                        "episode_title": item.get("title"),
+                        "season": item.get("parent_media_index"),
+                        "episode": item.get("media_index"),
+                        "season_episode": f"S{str(item.get('parent_media_index', 0)).zfill(2)}E{str(item.get('media_index', 0)).zfill(2)}",
+                        "added_at": added_at
+                    }
+            if reached or len(items) < self.page_size:
+                complete = True
+                break
+
+        if complete:
+            self._watermark = newest
+        else:
+            print(f"Tautulli recently added: stopped after {self.max_pages} pages, keeping watermark")
+        self._recent = {key: e for key, e in self._recent.items() if e["added_at"] >= cutoff}
+        return sorted(self._recent.values(), key=lambda e: e["added_at"], reverse=True)
+
+
+class ArrQueueService:
+    """Download queue of a Radarr/Sonarr (v3 API) instance
+
+    The queue is fetched in full: the first page gives totalRecords, the
+    remaining pages are fetched concurrently, at most fan_out at a time.
+    """
+
+    def __init__(self, name: str, base_url: str, api_key: str):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.page_size = 100
+        self.fan_out = 4
+        self.max_pages = 50
+        self.last_fetch: Dict[str, Any] = {}
+        self._index: Optional[Tuple[Dict[str, Any], Dict[str, List[Dict[str, Any]]]]] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.base_url)
+
+    async def _page(self, page: int) -> Tuple[Dict[str, Any], float]:
+        """Fetch one queue page, returns (data, elapsed ms)"""
+        start = time.perf_counter()
+        client = http_clients.get(self.name)
+        response = await client.get(
+            f"{self.base_url}/api/v3/queue",
+            params={"page": page, "pageSize": self.page_size},
+            headers={"X-Api-Key": self.api_key}
+        )
+        response.raise_for_status()
+        return response.json(), (time.perf_counter() - start) * 1000
+
+    @refreshable("{self.name}:queue", interval=15, publish="queues:{self.name}")
     async def get_queue(self) -> Dict[str, Any]:
-        """Get Radarr download queue"""
-        cache_key = "radarr:queue"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
-        url = f"{settings.RADARR_URL}/api/v3/queue"
-        headers = {"X-Api-Key": settings.RADARR_API_KEY}
-
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-
-        result = {
-            "totalRecords": data.get("totalRecords", 0),
-            "records": [
-                {
+        """Get the full download queue"""
+        start = time.perf_counter()
+        first, first_ms = await self._page(1)
+        total = first.get("totalRecords", 0)
+        pages = min(-(-total // self.page_size), self.max_pages)
+
+        sem = asyncio.Semaphore(self.fan_out)
+
+        async def fetch(page: int):
+            async with sem:
+                return await self._page(page)
+
+        rest = await asyncio.gather(*(fetch(page) for page in range(2, pages + 1)))
+        page_ms = [first_ms] + [ms for _, ms in rest]
+
+        records = []
+        for data in [first] + [data for data, _ in rest]:
+            for r in data.get("records", []):
+                records.append({
+                    "id": r.get("id"),
                     "title": r.get("title"),
                     "status": r.get("status"),
                     "timeleft": r.get("timeleft"),
                     "sizeleft": r.get("sizeleft"),
                     "size": r.get("size")
-                }
-                for r in data.get("records", [])
-            ]
+                })
+
+        status_counts: Dict[str, int] = {}
+        for record in records:
+            status = str(record["status"] or "unknown").lower()
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+        # Timings live outside the cached value so unchanged queues stay unchanged
+        self.last_fetch = {
+            "pages": len(page_ms),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "slowest_page_ms": round(max(page_ms), 1),
+            "fetched_at": time.time()
         }
 
-        await cache.set(cache_key, result, ttl=15)
-        return result
+        return {
+            "totalRecords": total,
+            "records": records,
+            "statusCounts": status_counts
+        }
 
+    def by_status(self, queue: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Records of a get_queue result grouped by lowercase status, built once per result"""
+        if self._index is None or self._index[0] is not queue:
+            index: Dict[str, List[Dict[str, Any]]] = {}
+            for record in queue["records"]:
+                index.setdefault(str(record["status"] or "unknown").lower(), []).append(record)
+            self._index = (queue, index)
+        return self._index[1]
 
-class SabnzbdService:
-    """SABnzbd download service"""
 
+class RadarrService(ArrQueueService):
+    """Radarr movie management service"""
+
+    def __init__(self):
+        super().__init__("radarr", settings.RADARR_URL, settings.RADARR_API_KEY)
+
+
+class SonarrService(ArrQueueService):
+    """Sonarr TV management service"""
+
+    def __init__(self):
+        super().__init__("sonarr", settings.SONARR_URL, settings.SONARR_API_KEY)
+
+
+class ArrQueues:
+    """Combined, filterable view over the Radarr and Sonarr queues"""
+
+    def __init__(self, services: List[ArrQueueService]):
+        self.services = services
+
+    async def query(
+        self,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """Page through queue records, optionally filtered by status and source"""
+        services = [s for s in self.services if s.configured and (source is None or s.name == source)]
+        results = await asyncio.gather(*(s.get_queue() for s in services), return_exceptions=True)
+
+        matches: List[Dict[str, Any]] = []
+        counts: Dict[str, int] = {}
+        sources: Dict[str, Any] = {}
+        for service, queue in zip(services, results):
+            if isinstance(queue, Exception):
+                print(f"{service.name} queue error: {queue}")
+                sources[service.name] = {"error": error_summary(queue), "fetch": service.last_fetch}
+                continue
+            sources[service.name] = {"totalRecords": queue["totalRecords"], "fetch": service.last_fetch}
+            for name, count in queue["statusCounts"].items():
+                counts[name] = counts.get(name, 0) + count
+
+            if status is None:
+                selected = queue["records"]
+            else:
+                selected = service.by_status(queue).get(status.lower(), [])
+            matches.extend({**record, "source": service.name} for record in selected)
+
+        return {
+            "total": len(matches),
+            "offset": offset,
+            "limit": limit,
+            "records": matches[offset:offset + limit],
+            "statusCounts": counts,
+            "sources": sources
+        }
+
+
+class SabnzbdService:
+    """SABnzbd download service
+
+    Polls every active_interval seconds while downloading; once idle or
+    paused the interval starts at idle_interval and doubles on every poll
+    up to max_idle_interval.
+    """
+
+    def __init__(self):
+        self.active_interval = settings.SABNZBD_ACTIVE_INTERVAL
+        self.idle_interval = 10  # seconds, first poll after going idle
+        self.max_idle_interval = settings.SABNZBD_IDLE_MAX_INTERVAL
+
+    @property
+    def configured(self) -> bool:
+        return bool(settings.SABNZBD_URL)
+
+    def _next_interval(self, current: float, status: str, slots: int) -> float:
+        """Refresh interval after observing status and queue size"""
+        if status == "Downloading" and slots > 0:
+            return self.active_interval
+        if current < self.idle_interval:
+            return self.idle_interval
+        return min(current * 2, self.max_idle_interval)
+
+    @refreshable("sabnzbd:status", interval=10, publish="queues:sabnzbd")
     async def get_status(self) -> Dict[str, Any]:
         """Get SABnzbd queue status"""
-        cache_key = "sabnzbd:status"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
         url = f"{settings.SABNZBD_URL}/api"
         params = {
             "mode": "queue",
+            "limit": 1,  # header fields only; slot details are not used
             "apikey": settings.SABNZBD_API_KEY,
             "output": "json"
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        client = http_clients.get("sabnzbd")
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
 
         queue = data.get("queue", {})
         result = {
@@ -143,34 +344,54 @@ class SabnzbdService:
             "mb_left": queue.get("mbleft", "")
         }
 
-        await cache.set(cache_key, result, ttl=10)
+        source = refresh_scheduler.source("sabnzbd:status")
+        if source is not None:
+            try:
+                slots = int(result["queue_items"])
+            except (TypeError, ValueError):
+                slots = 0
+            source.interval = self._next_interval(source.interval, result["status"], slots)
+
         return result
 
 
 class OverseerrService:
     """Overseerr media request service"""
 
+    @property
+    def configured(self) -> bool:
+        return bool(settings.OVERSEERR_URL)
+
+    @refreshable("overseerr:counts", interval=60)
     async def get_request_counts(self) -> Dict[str, Any]:
         """Get Overseerr request counts"""
-        cache_key = "overseerr:counts"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
         url = f"{settings.OVERSEERR_URL}/api/v1/request/count"
         headers = {"X-Api-Key": settings.OVERSEERR_API_KEY}
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        client = http_clients.get("overseerr")
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        data = response.json()
 
-        await cache.set(cache_key, data, ttl=60)
         return data
 
 
+# Upstream HTTP clients
+http_clients.register("tautulli", timeout=settings.HTTP_TIMEOUT)
+http_clients.register("radarr", timeout=settings.HTTP_TIMEOUT)
+http_clients.register("sonarr", timeout=settings.HTTP_TIMEOUT)
+http_clients.register("sabnzbd", timeout=settings.HTTP_TIMEOUT)
+http_clients.register("overseerr", timeout=settings.HTTP_TIMEOUT)
+
 # Service instances
 tautulli_service = TautulliService()
 radarr_service = RadarrService()
+sonarr_service = SonarrService()
 sabnzbd_service = SabnzbdService()
 overseerr_service = OverseerrService()
+arr_queues = ArrQueues([radarr_service, sonarr_service])
+
+# Only keep configured upstreams warm; the rest would fail every refresh
+for service in (tautulli_service, radarr_service, sonarr_service, sabnzbd_service, overseerr_service):
+    if service.configured:
+        refresh_scheduler.register_service(service)
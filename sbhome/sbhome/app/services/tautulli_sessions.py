@@ -0,0 +1,100 @@
+"""
+Plex session table kept current from Tautulli webhook notifications
+"""
+from typing import Any, Dict, List
+import time
+
+
+# Tautulli {action} values and the session state they leave behind
+ACTION_STATES = {
+    "play": "playing",
+    "resume": "playing",
+    "pause": "paused",
+    "buffer": "buffering"
+}
+STOP_ACTIONS = {"stop"}
+
+# Payload fields copied onto the session (Tautulli get_activity names)
+SESSION_FIELDS = (
+    "user", "full_title", "grandparent_title", "title", "media_type",
+    "player", "product", "progress_percent", "transcode_decision"
+)
+
+# JSON data to configure on Tautulli's Webhook notification agent
+WEBHOOK_TEMPLATE = {
+    "action": "{action}",
+    "session_key": "{session_key}",
+    "user": "{user}",
+    "full_title": "{title}",
+    "grandparent_title": "{show_name}",
+    "title": "{episode_name}",
+    "media_type": "{media_type}",
+    "player": "{player}",
+    "product": "{product}",
+    "progress_percent": "{progress_percent}",
+    "transcode_decision": "{transcode_decision}"
+}
+
+
+class SessionTable:
+    """Current Plex sessions by session_key
+
+    Webhooks upsert or remove single sessions; the periodic get_activity
+    poll replaces the whole table, unless a webhook landed while that poll
+    was in flight (its view would be older than the table's).
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self.generation = 0  # bumped by every applied webhook
+        self._stats = {
+            "webhooks": 0,
+            "applied": 0,
+            "ignored": 0,
+            "reconciles": 0,
+            "reconciles_skipped": 0,
+            "last_webhook": None
+        }
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """Current sessions"""
+        return list(self._sessions.values())
+
+    def apply(self, payload: Dict[str, Any]) -> bool:
+        """Apply one webhook payload, returns whether the table changed"""
+        self._stats["webhooks"] += 1
+        self._stats["last_webhook"] = time.time()
+        action = str(payload.get("action", "")).lower()
+        session_key = str(payload.get("session_key") or "")
+        if not session_key or (action not in ACTION_STATES and action not in STOP_ACTIONS):
+            self._stats["ignored"] += 1
+            return False
+
+        if action in STOP_ACTIONS:
+            if self._sessions.pop(session_key, None) is None:
+                self._stats["ignored"] += 1
+                return False
+        else:
+            session = {**self._sessions.get(session_key, {"session_key": session_key})}
+            for field in SESSION_FIELDS:
+                if payload.get(field) not in (None, ""):
+                    session[field] = payload[field]
+            session["state"] = ACTION_STATES[action]
+            self._sessions[session_key] = session
+
+        self.generation += 1
+        self._stats["applied"] += 1
+        return True
+
+    def reconcile(self, sessions: List[Dict[str, Any]], seen_generation: int) -> bool:
+        """Replace the table with polled sessions unless a webhook landed since seen_generation"""
+        if self.generation != seen_generation:
+            self._stats["reconciles_skipped"] += 1
+            return False
+        self._sessions = {str(s.get("session_key")): s for s in sessions}
+        self._stats["reconciles"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get webhook and reconcile counters"""
+        return {**self._stats, "sessions": len(self._sessions)}
@@ -1,11 +1,114 @@
 """
 Traefik HTTP Provider service
 """
-import httpx
-from typing import List, Dict, Any
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Set, Tuple
+import re
 
 from app.core.config import settings
-from app.core.cache import cache
+from app.core.refresh import refreshable, refresh_scheduler
+from app.core.http import http_clients
+
+_TOKEN_SPLIT = re.compile(r"[-_.:/\s]+")
+
+
+class RouteIndex:
+    """Lookup tables over one /services result
+
+    Routes are referred to by their position in the provider's list so
+    every filter keeps the provider's order. Search terms are the lowercase
+    name, domains, backend host and container name, plus their
+    dash/dot-separated parts, kept sorted so a prefix match is a bisect
+    and a short scan instead of a pass over every route.
+    """
+
+    def __init__(self, routes: List[Dict[str, Any]]):
+        self.routes = routes
+        self.static: List[Dict[str, Any]] = []
+        self.docker: List[Dict[str, Any]] = []
+        self.static_positions: Set[int] = set()
+        self.by_host: Dict[str, List[int]] = {}
+        self.by_domain: Dict[str, List[int]] = {}
+        terms: Set[Tuple[str, int]] = set()
+
+        for position, route in enumerate(routes):
+            if route.get("is_static", False):
+                self.static.append(route)
+                self.static_positions.add(position)
+            else:
+                self.docker.append(route)
+
+            host = str(route.get("host") or "").lower()
+            if host:
+                self.by_host.setdefault(host, []).append(position)
+
+            domains = {str(d).lower() for d in route.get("domains") or [route.get("domain")] if d}
+            zones = set()
+            for domain in domains:
+                # Every parent zone too, so "example.com" finds "a.example.com"
+                labels = domain.split(".")
+                zones.update(".".join(labels[start:]) for start in range(max(len(labels) - 1, 1)))
+            for zone in zones:
+                self.by_domain.setdefault(zone, []).append(position)
+
+            for value in (route.get("name"), route.get("container_name"), host, *domains):
+                if not value:
+                    continue
+                value = str(value).lower()
+                terms.add((value, position))
+                terms.update((part, position) for part in _TOKEN_SPLIT.split(value) if part)
+
+        self._terms = sorted(terms)
+
+    def _prefix(self, prefix: str) -> Set[int]:
+        """Positions of routes with any search term starting with prefix"""
+        matches = set()
+        terms = self._terms
+        for i in range(bisect_left(terms, (prefix, -1)), len(terms)):
+            term, position = terms[i]
+            if not term.startswith(prefix):
+                break
+            matches.add(position)
+        return matches
+
+    def query(
+        self,
+        q: Optional[str] = None,
+        static: Optional[bool] = None,
+        host: Optional[str] = None,
+        domain: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """Page through routes matching every given filter
+
+        Each word of q must prefix-match one of a route's search terms.
+        """
+        candidates: Optional[Set[int]] = None
+
+        def narrow(positions):
+            nonlocal candidates
+            candidates = set(positions) if candidates is None else candidates & set(positions)
+
+        if host:
+            narrow(self.by_host.get(host.lower(), []))
+        if domain:
+            narrow(self.by_domain.get(domain.lower(), []))
+        for word in (q or "").lower().split():
+            narrow(self._prefix(word))
+
+        if candidates is None:
+            selected = self.routes if static is None else self.static if static else self.docker
+            total = len(selected)
+            page = selected[offset:offset + limit]
+        else:
+            if static is not None:
+                candidates = {p for p in candidates if (p in self.static_positions) == static}
+            positions = sorted(candidates)
+            total = len(positions)
+            page = [self.routes[p] for p in positions[offset:offset + limit]]
+
+        return {"total": total, "offset": offset, "limit": limit, "routes": page}
 
 
 class TraefikService:
@@ -13,22 +116,25 @@ class TraefikService:
 
     def __init__(self):
         self.base_url = settings.TRAEFIK_HTTP_PROVIDER_URL
+        self._index: Optional[Tuple[Dict[str, Any], RouteIndex]] = None
 
+    @refreshable("traefik:services", interval=30)
     async def get_services(self) -> Dict[str, Any]:
         """Get all services from Traefik HTTP Provider"""
-        cache_key = "traefik:services"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
+        client = http_clients.get("traefik")
+        response = await client.get(f"{self.base_url}/services")
+        response.raise_for_status()
+        data = response.json()
 
-        async with httpx.AsyncClient(timeout=10.0, verify=False) as client:
-            response = await client.get(f"{self.base_url}/services")
-            response.raise_for_status()
-            data = response.json()
-
-        await cache.set(cache_key, data, ttl=30)
+        self.index(data)
         return data
 
+    def index(self, services: Dict[str, Any]) -> RouteIndex:
+        """RouteIndex of a get_services result, built once per result"""
+        if self._index is None or self._index[0] is not services:
+            self._index = (services, RouteIndex(services.get("services", [])))
+        return self._index[1]
+
     async def get_routes(self) -> List[Dict[str, Any]]:
         """Get all routes"""
         services = await self.get_services()
@@ -36,13 +142,28 @@ class TraefikService:
 
     async def get_docker_routes(self) -> List[Dict[str, Any]]:
         """Get Docker container routes only"""
-        routes = await self.get_routes()
-        return [r for r in routes if not r.get("is_static", False)]
+        return self.index(await self.get_services()).docker
 
     async def get_static_routes(self) -> List[Dict[str, Any]]:
         """Get static routes only"""
-        routes = await self.get_routes()
-        return [r for r in routes if r.get("is_static", False)]
+        return self.index(await self.get_services()).static
+
+    async def query_routes(
+        self,
+        q: Optional[str] = None,
+        static: Optional[bool] = None,
+        host: Optional[str] = None,
+        domain: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """Search and page through routes"""
+        index = self.index(await self.get_services())
+        return index.query(q, static, host, domain, limit, offset)
 
 
+http_clients.register("traefik", timeout=settings.HTTP_TIMEOUT, verify=False)
+
 traefik_service = TraefikService()
+
+refresh_scheduler.register_service(traefik_service)
@@ -0,0 +1,231 @@
+"""
+UniFi controller event-stream ingestion (optional client table mode)
+"""
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import ssl
+import time
+
+import websockets
+
+from app.services.unifi_stats import ClientRecord, compact_client
+
+
+CONNECT_EVENTS = {"EVT_WU_Connected", "EVT_WG_Connected", "EVT_LU_Connected"}
+DISCONNECT_EVENTS = {"EVT_WU_Disconnected", "EVT_WG_Disconnected", "EVT_LU_Disconnected"}
+ROAM_EVENTS = {"EVT_WU_Roam", "EVT_WG_Roam", "EVT_WU_RoamRadio", "EVT_WG_RoamRadio"}
+
+
+class UnifiEventStream:
+    """In-memory client table kept current from the controller's event websocket
+
+    The table is seeded with a full stat/sta resync on every (re)connect and
+    again every resync_interval seconds; in between, connect, disconnect and
+    roam events (and sta:sync pushes) are applied incrementally by MAC.
+    """
+
+    def __init__(
+        self,
+        session,
+        url: str,
+        resync: Callable[[], Awaitable[List[ClientRecord]]],
+        on_change: Optional[Callable[[], Awaitable[None]]] = None,
+        resync_interval: float = 300,
+        debounce: float = 1.0
+    ):
+        self.session = session
+        self.url = url
+        self._resync = resync
+        self._on_change = on_change
+        self.resync_interval = resync_interval
+        self.debounce = debounce
+        self._clients: Dict[str, ClientRecord] = {}
+        self._synced = False
+        self._connected = False
+        self._backoff = 1  # seconds before the next reconnect
+        self._task: Optional[asyncio.Task] = None
+        self._notify_task: Optional[asyncio.Task] = None
+        self._stats = {
+            "events_received": 0,
+            "events_applied": 0,
+            "connects": 0,
+            "resyncs": 0,
+            "last_resync": None,
+            "last_event": None,
+            "last_error": None
+        }
+
+    @property
+    def synced(self) -> bool:
+        """Whether the table is live and can replace stat/sta polling"""
+        return self._synced and self._connected
+
+    def clients(self) -> List[ClientRecord]:
+        """Current client list"""
+        return list(self._clients.values())
+
+    async def resync(self):
+        """Replace the table with a full stat/sta fetch"""
+        clients = await self._resync()
+        self._clients = {client.mac: client for client in clients}
+        self._synced = True
+        self._stats["resyncs"] += 1
+        self._stats["last_resync"] = time.time()
+        self._changed()
+
+    def apply(self, message: Dict[str, Any]) -> int:
+        """Apply one websocket message to the table, returns events applied"""
+        meta = message.get("meta", {})
+        kind = meta.get("message")
+        applied = 0
+
+        for item in message.get("data", []):
+            self._stats["events_received"] += 1
+            if kind == "sta:sync":
+                client = compact_client(item)
+                if client.mac:
+                    self._clients[client.mac] = client
+                    applied += 1
+            elif kind == "events":
+                applied += self._apply_event(item)
+
+        if applied:
+            self._stats["events_applied"] += applied
+            self._stats["last_event"] = time.time()
+            self._changed()
+        return applied
+
+    def _apply_event(self, event: Dict[str, Any]) -> int:
+        """Apply a single controller event"""
+        key = event.get("key", "")
+        mac = event.get("user") or event.get("guest")
+        if not mac:
+            return 0
+
+        if key in DISCONNECT_EVENTS:
+            return 1 if self._clients.pop(mac, None) is not None else 0
+
+        if key in CONNECT_EVENTS:
+            client = self._clients.get(mac) or compact_client({
+                "mac": mac,
+                "hostname": event.get("hostname"),
+                "is_wired": key == "EVT_LU_Connected",
+                "is_guest": key == "EVT_WG_Connected"
+            })
+            changes = {
+                field: event[source]
+                for field, source in (("ap_mac", "ap"), ("essid", "ssid"), ("channel", "channel"),
+                                      ("radio", "radio"), ("network", "network"))
+                if event.get(source) is not None
+            }
+            # Records may be shared with cached lists, so replace rather than mutate
+            self._clients[mac] = replace(client, **changes)
+            return 1
+
+        if key in ROAM_EVENTS:
+            client = self._clients.get(mac)
+            if client is None:
+                return 0
+            changes = {
+                field: event[source]
+                for field, source in (("ap_mac", "ap_to"), ("channel", "channel_to"), ("radio", "radio_to"))
+                if event.get(source) is not None
+            }
+            self._clients[mac] = replace(client, **changes)
+            return 1
+
+        return 0
+
+    def _changed(self):
+        """Schedule a debounced change notification"""
+        if self._on_change is None:
+            return
+        if self._notify_task is None or self._notify_task.done():
+            self._notify_task = asyncio.create_task(self._notify())
+
+    async def _notify(self):
+        await asyncio.sleep(self.debounce)
+        try:
+            await self._on_change()
+        except Exception as e:
+            print(f"UniFi event change handler error: {e}")
+
+    async def _run(self):
+        """Connect, resync and apply events, reconnecting with backoff"""
+        while True:
+            try:
+                await self._stream()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["last_error"] = str(e)
+                print(f"UniFi event stream error: {e}")
+            self._connected = False
+            await asyncio.sleep(self._backoff)
+            self._backoff = min(self._backoff * 2, 60)
+
+    async def _stream(self):
+        """One websocket connection lifetime"""
+        headers = {}
+        if self.url.startswith("wss://"):
+            await self.session.ensure_login()
+            headers = self.session.auth_headers()
+
+        ssl_context = None
+        if self.url.startswith("wss://"):
+            # The controller uses a self-signed certificate
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+        async with websockets.connect(self.url, additional_headers=headers, ssl=ssl_context) as ws:
+            self._connected = True
+            self._backoff = 1  # a healthy connection forgets earlier flaps
+            self._stats["connects"] += 1
+            try:
+                await self.resync()
+            except Exception as e:
+                # Events still flow; the next periodic resync will fill gaps
+                print(f"UniFi client resync failed: {e}")
+
+            next_resync = time.monotonic() + self.resync_interval
+            while True:
+                timeout = max(next_resync - time.monotonic(), 0)
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout)
+                except asyncio.TimeoutError:
+                    try:
+                        await self.resync()
+                    except Exception as e:
+                        print(f"UniFi client resync failed: {e}")
+                    next_resync = time.monotonic() + self.resync_interval
+                    continue
+
+                try:
+                    self.apply(json.loads(raw))
+                except (ValueError, AttributeError) as e:
+                    print(f"Ignoring malformed UniFi event: {e}")
+
+    def start(self):
+        """Start consuming the event stream"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop consuming the event stream"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._connected = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get event and resync counters"""
+        return {
+            **self._stats,
+            "enabled": self._task is not None,
+            "connected": self._connected,
+            "synced": self.synced,
+            "clients": len(self._clients)
+        }
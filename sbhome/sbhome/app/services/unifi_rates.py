@@ -0,0 +1,134 @@
+"""
+Per-client UniFi throughput rates from byte counter deltas
+"""
+from array import array
+from typing import Any, Dict, Iterable, Optional
+import heapq
+import time
+
+from app.services.unifi_stats import ClientRecord
+
+
+class _CounterRing:
+    """Fixed-size ring of (time, rx_bytes, tx_bytes) samples for one client"""
+
+    __slots__ = ("times", "rx", "tx", "head", "count")
+
+    def __init__(self, capacity: int):
+        self.times = array("d", bytes(8 * capacity))
+        self.rx = array("q", bytes(8 * capacity))
+        self.tx = array("q", bytes(8 * capacity))
+        self.head = 0  # next write position
+        self.count = 0
+
+    def reset(self):
+        self.head = 0
+        self.count = 0
+
+    def append(self, at: float, rx: int, tx: int):
+        capacity = len(self.times)
+        self.times[self.head] = at
+        self.rx[self.head] = rx
+        self.tx[self.head] = tx
+        self.head = (self.head + 1) % capacity
+        self.count = min(self.count + 1, capacity)
+
+    def _index(self, age: int) -> int:
+        """Position of the sample `age` steps back from the newest"""
+        return (self.head - 1 - age) % len(self.times)
+
+    def newest(self) -> int:
+        return self._index(0)
+
+    def rate(self, older: int) -> Optional[tuple]:
+        """(rx, tx) bytes/s between the newest sample and one `older` steps back"""
+        if self.count < 2:
+            return None
+        new = self._index(0)
+        old = self._index(min(older, self.count - 1))
+        elapsed = self.times[new] - self.times[old]
+        if elapsed <= 0:
+            return None
+        return (
+            (self.rx[new] - self.rx[old]) / elapsed,
+            (self.tx[new] - self.tx[old]) / elapsed
+        )
+
+
+class ClientRates:
+    """Rolling rx/tx counter samples per MAC
+
+    Each refresh appends one sample per client (O(clients)); every ring has
+    a fixed capacity, and clients missing from a refresh are dropped, so
+    memory is bounded by current clients x samples. A counter going
+    backwards (client reconnected) restarts that client's ring. Samples are
+    stamped with time.monotonic() so wall-clock steps can't skew rates.
+    """
+
+    def __init__(self, samples: int = 12):
+        self.samples = max(samples, 2)
+        self._rings: Dict[str, _CounterRing] = {}
+        self._info: Dict[str, ClientRecord] = {}
+        self.last_sample: Optional[float] = None  # wall time, for display
+
+    def record(self, clients: Iterable[ClientRecord], at: Optional[float] = None):
+        """Add one sample for every client in a full client list
+
+        at is a time.monotonic() reading, defaulting to now.
+        """
+        at = time.monotonic() if at is None else at
+        rings = {}
+        info = {}
+        for client in clients:
+            mac = client.mac
+            if not mac:
+                continue
+            ring = self._rings.get(mac) or _CounterRing(self.samples)
+            rx, tx = client.rx_bytes, client.tx_bytes
+            if ring.count:
+                newest = ring.newest()
+                if rx < ring.rx[newest] or tx < ring.tx[newest]:
+                    ring.reset()
+            ring.append(at, rx, tx)
+            rings[mac] = ring
+            info[mac] = client
+        self._rings = rings
+        self._info = info
+        self.last_sample = time.time()
+
+    def rates(self, top_n: int = 10) -> Dict[str, Any]:
+        """Current and window-average rates, with the top talkers by current rate"""
+        total_rx = 0.0
+        total_tx = 0.0
+        measured = []
+        for mac, ring in self._rings.items():
+            current = ring.rate(1)
+            if current is None:
+                continue
+            total_rx += current[0]
+            total_tx += current[1]
+            measured.append((current[0] + current[1], mac, current))
+
+        top = heapq.nlargest(top_n, measured)
+        # Window averages only for the winners, falling back to the current rate
+        averages = {mac: self._rings[mac].rate(self.samples) or current for _, mac, current in top}
+        return {
+            "sampled_at": self.last_sample,
+            "clients": len(self._rings),
+            "measured_clients": len(measured),
+            "rx_bytes_per_sec": round(total_rx),
+            "tx_bytes_per_sec": round(total_tx),
+            "top_talkers": [
+                {
+                    "mac": mac,
+                    "name": self._info[mac].name,
+                    "ip": self._info[mac].ip,
+                    "is_wired": self._info[mac].is_wired,
+                    "rx_bytes_per_sec": round(current[0]),
+                    "tx_bytes_per_sec": round(current[1]),
+                    "rx_bytes_per_sec_avg": round(averages[mac][0]),
+                    "tx_bytes_per_sec_avg": round(averages[mac][1])
+                }
+                for _, mac, current in top
+            ]
+        }
@@ -1,11 +1,19 @@
 """
 UniFi Network service
 """
-import httpx
+import asyncio
+import time
 from typing import List, Dict, Any
 
 from app.core.config import settings
-from app.core.cache import cache
+from app.core.refresh import refreshable, refresh_scheduler
+from app.core.http import http_clients
+from app.services.unifi_session import UnifiSession
+from app.services.unifi_events import UnifiEventStream
+from app.services.unifi_rates import ClientRates
+from app.services.unifi_stats import (
+    ClientRecord, DeviceRecord, aggregate_clients, compact_client, compact_device
+)
 
 
 class UnifiService:
@@ -13,210 +21,138 @@ class UnifiService:
 
     def __init__(self):
         self.base_url = settings.UNIFI_URL
-        self.username = settings.UNIFI_USERNAME
-        self.password = settings.UNIFI_PASSWORD
-        self._csrf_token = None
-        self._cookies = None
-
-    async def _authenticate(self):
-        """Authenticate with UniFi controller"""
-        async with httpx.AsyncClient(verify=False, timeout=10.0) as client:
-            # Login
-            login_data = {
-                "username": self.username,
-                "password": self.password
-            }
-            response = await client.post(
-                f"{self.base_url}/api/auth/login",
-                json=login_data
-            )
-            response.raise_for_status()
-
-            # Save cookies and CSRF token
-            self._cookies = response.cookies
-            self._csrf_token = response.headers.get("x-csrf-token")
+        self.session = UnifiSession(
+            lambda: http_clients.get("unifi"),
+            base_url=settings.UNIFI_URL,
+            username=settings.UNIFI_USERNAME,
+            password=settings.UNIFI_PASSWORD
+        )
+        self.events = UnifiEventStream(
+            self.session,
+            url=settings.UNIFI_EVENTS_URL or self._default_events_url(),
+            resync=self._fetch_clients,
+            on_change=self._clients_changed,
+            resync_interval=settings.UNIFI_EVENTS_RESYNC_INTERVAL
+        )
+        self.rates = ClientRates(samples=settings.UNIFI_RATE_SAMPLES)
+
+    def _default_events_url(self) -> str:
+        """Controller event websocket derived from UNIFI_URL"""
+        base = self.base_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+        return f"{base}/proxy/network/wss/s/default/events?clients=v2"
+
+    async def _clients_changed(self):
+        """Push event-stream changes into the cached client views"""
+        await refresh_scheduler.refresh("unifi:clients")
+        await refresh_scheduler.refresh("unifi:network_stats")
 
     async def _make_request(self, endpoint: str) -> Dict[str, Any]:
         """Make authenticated request to UniFi API"""
-        # Ensure we're authenticated
-        if not self._csrf_token:
-            await self._authenticate()
-
         url = f"{self.base_url}/proxy/network/api/s/default/{endpoint}"
-        headers = {"X-Csrf-Token": self._csrf_token}
-
-        async with httpx.AsyncClient(verify=False, timeout=10.0, cookies=self._cookies) as client:
-            response = await client.get(url, headers=headers)
+        response = await self.session.get(url)
+        return response.json()
 
-            # Re-authenticate if token expired
-            if response.status_code == 401:
-                await self._authenticate()
-                headers = {"X-Csrf-Token": self._csrf_token}
-                response = await client.get(url, headers=headers)
+    @refreshable("unifi:device_snapshot", interval=30)
+    async def get_device_snapshot(self) -> Dict[str, Any]:
+        """Get one timestamped stat/device snapshot that device and gateway views share"""
+        data = await self._make_request("stat/device")
 
-            response.raise_for_status()
-            return response.json()
+        devices = []
+        gateway = None
+        for d in data.get("data", []):
+            devices.append(compact_device(d))
+
+            # First gateway device
+            if gateway is None and d.get("type") in ["udm", "uxg", "ugw", "usg"]:
+                gateway = {
+                    "name": d.get("name", "Unknown"),
+                    "model": d.get("model", "Unknown"),
+                    "cpu": d.get("system-stats", {}).get("cpu", 0),
+                    "mem": d.get("system-stats", {}).get("mem", 0),
+                    "uptime": d.get("uptime", 0),
+                    "wan_ip": d.get("wan1", {}).get("ip", "N/A"),
+                    "version": d.get("version", "Unknown"),
+                    "speedtest_status": d.get("speedtest-status", {}),
+                    "wan_uptime": d.get("uptime", 0)
+                }
+
+        return {
+            "fetched_at": time.time(),
+            "devices": devices,
+            "gateway": gateway or {}
+        }
 
-    async def get_devices(self) -> List[Dict[str, Any]]:
+    async def get_devices(self) -> List[DeviceRecord]:
         """Get all UniFi devices"""
-        cache_key = "unifi:devices"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
-        data = await self._make_request("stat/device")
-
-        devices = [
-            {
-                "name": d.get("name"),
-                "ip": d.get("ip"),
-                "type": d.get("type"),
-                "model": d.get("model"),
-                "mac": d.get("mac"),
-                "num_sta": d.get("num_sta", 0),
-                "user_num_sta": d.get("user-num_sta", 0),
-                "guest_num_sta": d.get("guest-num_sta", 0),
-                "uptime": d.get("uptime", 0),
-                "state": d.get("state", 0),
-                "cpu": d.get("system-stats", {}).get("cpu", 0),
-                "mem": d.get("system-stats", {}).get("mem", 0)
-            }
-            for d in data.get("data", [])
-        ]
-
-        await cache.set(cache_key, devices, ttl=300)  # 5 minutes
-        return devices
+        snapshot = await self.get_device_snapshot()
+        return snapshot["devices"]
 
     async def get_gateway_stats(self) -> Dict[str, Any]:
         """Get gateway statistics"""
-        cache_key = "unifi:gateway_stats"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
-        data = await self._make_request("stat/device")
-
-        # Find gateway device
-        gateway = None
-        for device in data.get("data", []):
-            if device.get("type") in ["udm", "uxg", "ugw", "usg"]:
-                gateway = device
-                break
-
-        if not gateway:
-            return {}
-
-        result = {
-            "name": gateway.get("name", "Unknown"),
-            "model": gateway.get("model", "Unknown"),
-            "cpu": gateway.get("system-stats", {}).get("cpu", 0),
-            "mem": gateway.get("system-stats", {}).get("mem", 0),
-            "uptime": gateway.get("uptime", 0),
-            "wan_ip": gateway.get("wan1", {}).get("ip", "N/A"),
-            "version": gateway.get("version", "Unknown"),
-            "speedtest_status": gateway.get("speedtest-status", {}),
-            "wan_uptime": gateway.get("uptime", 0)
-        }
-
-        await cache.set(cache_key, result, ttl=30)
-        return result
+        snapshot = await self.get_device_snapshot()
+        return snapshot["gateway"]
 
-    async def get_clients(self) -> List[Dict[str, Any]]:
+    @refreshable("unifi:clients", interval=10)
+    async def get_clients(self) -> List[ClientRecord]:
         """Get all connected clients"""
-        cache_key = "unifi:clients"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
+        if self.events.synced:
+            # Event-stream mode: the table is kept current by controller events
+            return self.events.clients()
+        return await self._fetch_clients()
 
+    async def _fetch_clients(self) -> List[ClientRecord]:
+        """Fetch the full client list from stat/sta"""
         data = await self._make_request("stat/sta")
-
-        clients = []
-        for client in data.get("data", []):
-            clients.append({
-                "mac": client.get("mac", ""),
-                "name": client.get("name") or client.get("hostname") or client.get("mac", "Unknown"),
-                "ip": client.get("ip", "N/A"),
-                "is_wired": client.get("is_wired", False),
-                "is_guest": client.get("is_guest", False),
-                "ap_mac": client.get("ap_mac"),
-                "network": client.get("network", "Unknown"),
-                "rx_bytes": client.get("rx_bytes", 0),
-                "tx_bytes": client.get("tx_bytes", 0),
-                "signal": client.get("signal", 0),
-                "channel": client.get("channel", 0),
-                "radio": client.get("radio", ""),
-                "essid": client.get("essid", "")
-            })
-
-        await cache.set(cache_key, clients, ttl=10)
+        clients = [compact_client(client) for client in data.get("data", [])]
+        # Only full fetches carry fresh byte counters
+        self.rates.record(clients)
         return clients
 
+    async def get_client_rates(self, top_n: int = 10) -> Dict[str, Any]:
+        """Get current rx/tx rates and the top talkers by rate"""
+        # Make sure at least one sample has been taken
+        await self.get_clients()
+        return self.rates.rates(top_n)
+
+    @refreshable("unifi:network_stats", interval=10, publish="network")
     async def get_network_stats(self) -> Dict[str, Any]:
         """Get aggregated network statistics"""
-        cache_key = "unifi:network_stats"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
-        # Fetch all data
-        clients = await self.get_clients()
-        devices = await self.get_devices()
-        gateway = await self.get_gateway_stats()
-
-        # Count clients by type
-        wired_clients = sum(1 for c in clients if c["is_wired"])
-        wireless_clients = len(clients) - wired_clients
+        # Fetch clients and devices concurrently (at most two controller calls)
+        clients, snapshot = await asyncio.gather(
+            self.get_clients(),
+            self.get_device_snapshot()
+        )
+        devices = snapshot["devices"]
+        gateway = snapshot["gateway"]
 
         # Filter devices
-        aps = [d for d in devices if d["type"] == "uap"]
-        switches = [d for d in devices if d["type"] == "usw"]
-
-        # Sort clients by total bandwidth
-        clients_with_total = []
-        for client in clients:
-            total_bytes = client["rx_bytes"] + client["tx_bytes"]
-            clients_with_total.append({**client, "total_bytes": total_bytes})
-
-        top_clients = sorted(clients_with_total, key=lambda x: x["total_bytes"], reverse=True)[:10]
-
-        # Group clients by band
-        band_2g = sum(1 for c in clients if not c["is_wired"] and c["radio"] == "ng")
-        band_5g = sum(1 for c in clients if not c["is_wired"] and c["radio"] == "na")
-        band_6g = sum(1 for c in clients if not c["is_wired"] and c["radio"] == "6e")
+        aps = [d.to_dict() for d in devices if d.type == "uap"]
+        switches = [d.to_dict() for d in devices if d.type == "usw"]
 
-        # Group clients by SSID
-        ssid_counts = {}
-        for client in clients:
-            if not client["is_wired"]:
-                ssid = client.get("essid", "Unknown")
-                ssid_counts[ssid] = ssid_counts.get(ssid, 0) + 1
-
-        # Add "Wired" to SSID distribution
-        if wired_clients > 0:
-            ssid_counts["Wired"] = wired_clients
+        # Counts, band/SSID distributions and top talkers in one pass
+        client_stats = aggregate_clients(clients, top_n=10)
 
         result = {
             "gateway": gateway,
-            "total_clients": len(clients),
-            "wired_clients": wired_clients,
-            "wireless_clients": wireless_clients,
+            "total_clients": client_stats["total_clients"],
+            "wired_clients": client_stats["wired_clients"],
+            "wireless_clients": client_stats["wireless_clients"],
             "total_devices": len(devices),
             "aps": len(aps),
             "switches": len(switches),
             "ap_details": aps,
             "switch_details": switches,
-            "top_clients": top_clients,
-            "band_distribution": {
-                "2g": band_2g,
-                "5g": band_5g,
-                "6g": band_6g,
-                "wired": wired_clients
-            },
-            "ssid_distribution": ssid_counts
+            "top_clients": client_stats["top_clients"],
+            "band_distribution": client_stats["band_distribution"],
+            "ssid_distribution": client_stats["ssid_distribution"],
+            "devices_fetched_at": snapshot["fetched_at"]
         }
 
-        await cache.set(cache_key, result, ttl=10)
         return result
 
 
+http_clients.register("unifi", timeout=settings.HTTP_TIMEOUT, verify=False)
+
 unifi_service = UnifiService()
+
+refresh_scheduler.register_service(unifi_service)
@@ -0,0 +1,145 @@
+"""
+Managed, concurrency-safe UniFi OS login session
+"""
+from typing import Any, Dict, Optional
+import asyncio
+import base64
+import json
+import time
+
+import httpx
+
+
+def _token_expiry(token: Optional[str]) -> Optional[float]:
+    """Read the exp claim (epoch seconds) from the UniFi OS TOKEN cookie JWT"""
+    if not token or token.count(".") != 2:
+        return None
+    payload = token.split(".")[1]
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class UnifiSession:
+    """One logged-in session shared by every UniFi request
+
+    The session cookie lives in the pooled client's cookie jar. Logins are
+    single-flight: when several requests hit a 401 together, one logs in
+    and the rest retry with the new session. The session is renewed
+    refresh_margin seconds before the token expires.
+    """
+
+    def __init__(
+        self,
+        get_client,
+        base_url: str,
+        username: str,
+        password: str,
+        default_lifetime: float = 3600,
+        refresh_margin: float = 300
+    ):
+        self._get_client = get_client
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.default_lifetime = default_lifetime
+        self.refresh_margin = refresh_margin
+        self._csrf_token: Optional[str] = None
+        self._expires_at: Optional[float] = None  # monotonic
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._stats = {
+            "logins": 0,
+            "login_failures": 0,
+            "reauth_on_401": 0,
+            "requests": 0,
+            "request_errors": 0,
+            "last_request_ms": None,
+            "max_request_ms": 0.0,
+            "total_request_ms": 0.0
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._get_client()
+
+    def _needs_login(self) -> bool:
+        if self._csrf_token is None or self._expires_at is None:
+            return True
+        return time.monotonic() >= self._expires_at - self.refresh_margin
+
+    async def _login(self, seen_generation: int):
+        """Log in unless another request already did since seen_generation"""
+        async with self._lock:
+            if self._generation != seen_generation:
+                return
+
+            try:
+                response = await self.client.post(
+                    f"{self.base_url}/api/auth/login",
+                    json={"username": self.username, "password": self.password}
+                )
+                response.raise_for_status()
+            except Exception:
+                self._stats["login_failures"] += 1
+                raise
+
+            self._csrf_token = response.headers.get("x-csrf-token")
+            expiry = _token_expiry(response.cookies.get("TOKEN"))
+            lifetime = expiry - time.time() if expiry else self.default_lifetime
+            self._expires_at = time.monotonic() + lifetime
+            self._generation += 1
+            self._stats["logins"] += 1
+
+    async def ensure_login(self):
+        """Log in, or renew a session that is about to expire"""
+        if self._needs_login():
+            await self._login(self._generation)
+
+    def auth_headers(self) -> Dict[str, str]:
+        """Cookie and CSRF headers for non-httpx clients (e.g. the event websocket)"""
+        cookies = "; ".join(f"{name}={value}" for name, value in self.client.cookies.items())
+        return {"Cookie": cookies, "X-Csrf-Token": self._csrf_token or ""}
+
+    async def get(self, url: str) -> httpx.Response:
+        """GET url with the session, logging in or renewing as needed"""
+        await self.ensure_login()
+
+        start = time.perf_counter()
+        try:
+            generation = self._generation
+            response = await self.client.get(url, headers={"X-Csrf-Token": self._csrf_token})
+
+            # Session expired server-side: log in once and retry
+            if response.status_code == 401:
+                self._stats["reauth_on_401"] += 1
+                await self._login(generation)
+                response = await self.client.get(url, headers={"X-Csrf-Token": self._csrf_token})
+
+            updated = response.headers.get("x-updated-csrf-token")
+            if updated:
+                self._csrf_token = updated
+
+            response.raise_for_status()
+            return response
+        except Exception:
+            self._stats["request_errors"] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._stats["requests"] += 1
+            self._stats["last_request_ms"] = round(elapsed_ms, 1)
+            self._stats["max_request_ms"] = round(max(self._stats["max_request_ms"], elapsed_ms), 1)
+            self._stats["total_request_ms"] += elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        """Get login counts and request latencies"""
+        stats = dict(self._stats)
+        total = stats.pop("total_request_ms")
+        stats["avg_request_ms"] = round(total / stats["requests"], 1) if stats["requests"] else None
+        stats["session_expires_in"] = (
+            round(self._expires_at - time.monotonic()) if self._expires_at is not None else None
+        )
+        return stats
@@ -0,0 +1,143 @@
+"""
+UniFi client records and single-pass aggregation
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+import heapq
+
+from app.core.snapshot import snapshot_record
+
+
+# UniFi radio codes -> band_distribution keys
+BANDS = {"ng": "2g", "na": "5g", "6e": "6g"}
+
+
+class _Record:
+    """Dict conversion for slotted records, used at the API boundary"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@snapshot_record
+@dataclass(slots=True)
+class ClientRecord(_Record):
+    """One connected client, as the dashboard uses it"""
+
+    mac: str
+    name: str
+    ip: str
+    is_wired: bool
+    is_guest: bool
+    ap_mac: Optional[str]
+    network: str
+    rx_bytes: int
+    tx_bytes: int
+    signal: int
+    channel: int
+    radio: str
+    essid: str
+
+
+@snapshot_record
+@dataclass(slots=True)
+class DeviceRecord(_Record):
+    """One UniFi network device (gateway, switch or AP)"""
+
+    name: Optional[str]
+    ip: Optional[str]
+    type: Optional[str]
+    model: Optional[str]
+    mac: Optional[str]
+    num_sta: int
+    user_num_sta: int
+    guest_num_sta: int
+    uptime: int
+    state: int
+    cpu: Any
+    mem: Any
+
+
+def compact_client(client: Dict[str, Any]) -> ClientRecord:
+    """Reduce a raw stat/sta client to the fields the dashboard uses"""
+    return ClientRecord(
+        mac=client.get("mac", ""),
+        name=client.get("name") or client.get("hostname") or client.get("mac", "Unknown"),
+        ip=client.get("ip", "N/A"),
+        is_wired=client.get("is_wired", False),
+        is_guest=client.get("is_guest", False),
+        ap_mac=client.get("ap_mac"),
+        network=client.get("network", "Unknown"),
+        rx_bytes=client.get("rx_bytes", 0),
+        tx_bytes=client.get("tx_bytes", 0),
+        signal=client.get("signal", 0),
+        channel=client.get("channel", 0),
+        radio=client.get("radio", ""),
+        essid=client.get("essid", "")
+    )
+
+
+def compact_device(device: Dict[str, Any]) -> DeviceRecord:
+    """Reduce a raw stat/device entry to the fields the dashboard uses"""
+    system_stats = device.get("system-stats", {})
+    return DeviceRecord(
+        name=device.get("name"),
+        ip=device.get("ip"),
+        type=device.get("type"),
+        model=device.get("model"),
+        mac=device.get("mac"),
+        num_sta=device.get("num_sta", 0),
+        user_num_sta=device.get("user-num_sta", 0),
+        guest_num_sta=device.get("guest-num_sta", 0),
+        uptime=device.get("uptime", 0),
+        state=device.get("state", 0),
+        cpu=system_stats.get("cpu", 0),
+        mem=system_stats.get("mem", 0)
+    )
+
+
+def aggregate_clients(clients: Iterable[ClientRecord], top_n: int = 10) -> Dict[str, Any]:
+    """Count clients by type, band and SSID and pick the top talkers in one pass
+
+    Top clients are kept in a bounded min-heap keyed on total bytes, so the
+    full list is never sorted and only the winners are converted to dicts
+    (with their total_bytes added). Ties keep list order, like a stable sort would.
+    """
+    total = 0
+    wired = 0
+    bands = {"2g": 0, "5g": 0, "6g": 0}
+    ssid_counts: Dict[str, int] = {}
+    heap: List[tuple] = []
+
+    for index, client in enumerate(clients):
+        total += 1
+        if client.is_wired:
+            wired += 1
+        else:
+            band = BANDS.get(client.radio)
+            if band is not None:
+                bands[band] += 1
+            ssid = client.essid
+            ssid_counts[ssid] = ssid_counts.get(ssid, 0) + 1
+
+        total_bytes = client.rx_bytes + client.tx_bytes
+        if len(heap) < top_n:
+            heapq.heappush(heap, (total_bytes, -index, client))
+        elif total_bytes > heap[0][0]:
+            heapq.heapreplace(heap, (total_bytes, -index, client))
+
+    # Add "Wired" to SSID distribution
+    if wired > 0:
+        ssid_counts["Wired"] = wired
+
+    heap.sort(reverse=True)
+    return {
+        "total_clients": total,
+        "wired_clients": wired,
+        "wireless_clients": total - wired,
+        "top_clients": [{**client.to_dict(), "total_bytes": total_bytes} for total_bytes, _, client in heap],
+        "band_distribution": {**bands, "wired": wired},
+        "ssid_distribution": ssid_counts
+    }
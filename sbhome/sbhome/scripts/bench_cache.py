@@ -0,0 +1,74 @@
+"""
+Micro-benchmark: SimpleCache read throughput under concurrency
+
+Compares the original single-lock, datetime-based cache ("before") with
+the current lock-free SimpleCache ("after"). Each coroutine reads a mix of
+hot keys in a tight loop, yielding to the event loop between reads the
+way request handlers do.
+
+Usage (from sbhome/sbhome):
+    python -m scripts.bench_cache
+"""
+from datetime import datetime, timedelta
+from typing import Any, Optional
+import asyncio
+import time
+
+from app.core.cache import SimpleCache
+
+KEYS = ["unifi:clients", "radarr:queue", "tautulli:activity", "traefik:services"]
+READS_PER_RUN = 200_000
+CONCURRENCY = [1, 10, 100]
+
+
+class LegacyCache:
+    """The original SimpleCache: one global lock, datetime expiry"""
+
+    def __init__(self):
+        self._cache = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        async with self._lock:
+            if key in self._cache:
+                value, expires_at = self._cache[key]
+                if datetime.now() < expires_at:
+                    return value
+                else:
+                    del self._cache[key]
+            return None
+
+    async def set(self, key: str, value: Any, ttl: int = 30):
+        async with self._lock:
+            expires_at = datetime.now() + timedelta(seconds=ttl)
+            self._cache[key] = (value, expires_at)
+
+
+async def _reader(cache, reads: int):
+    for i in range(reads):
+        await cache.get(KEYS[i % len(KEYS)])
+        if i % 8 == 0:
+            await asyncio.sleep(0)
+
+
+async def _run(cache, concurrency: int) -> float:
+    for key in KEYS:
+        await cache.set(key, {"key": key}, ttl=3600)
+
+    reads = READS_PER_RUN // concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*[_reader(cache, reads) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return reads * concurrency / elapsed
+
+
+async def main():
+    print(f"{'coroutines':>10}  {'before (reads/s)':>18}  {'after (reads/s)':>18}  {'speedup':>8}")
+    for concurrency in CONCURRENCY:
+        before = await _run(LegacyCache(), concurrency)
+        after = await _run(SimpleCache(), concurrency)
+        print(f"{concurrency:>10}  {before:>18,.0f}  {after:>18,.0f}  {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark: per-call httpx.AsyncClient vs. the shared keep-alive registry
+
+Starts a local HTTPS stand-in (self-signed cert generated with openssl)
+that answers like a small upstream JSON API, then times sequential calls
+made the old way (new client per call, as the services used to do) and
+through app.core.http's pooled client.
+
+Usage (from sbhome/sbhome; needs the openssl CLI):
+    python -m scripts.bench_http_pool
+"""
+import asyncio
+import os
+import ssl
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from app.core.http import HTTPClientRegistry
+
+CALLS = 200
+BODY = b'{"response": {"data": {"stream_count": 2, "sessions": []}}}'
+
+
+def _make_cert(directory: str):
+    """Generate a throwaway self-signed certificate for localhost"""
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=localhost"
+        ],
+        check=True,
+        capture_output=True
+    )
+    return cert, key
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal HTTP/1.1 keep-alive responder"""
+    try:
+        while True:
+            request = await reader.readuntil(b"\r\n\r\n")
+            if not request:
+                break
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(BODY)).encode() + b"\r\n"
+                b"\r\n" + BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _per_call(url: str) -> list:
+    timings = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10.0, verify=False) as client:
+            response = await client.get(url)
+            response.json()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def _pooled(url: str) -> list:
+    registry = HTTPClientRegistry()
+    registry.register("standin", verify=False)
+    await registry.startup()
+    timings = []
+    try:
+        for _ in range(CALLS):
+            start = time.perf_counter()
+            response = await registry.get("standin").get(url)
+            response.json()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        await registry.shutdown()
+    return timings
+
+
+def _report(label: str, timings: list):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(timings):7.2f} ms   p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+    return statistics.mean(timings)
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = _make_cert(directory)
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert, key)
+
+        server = await asyncio.start_server(_handle, "127.0.0.1", 0, ssl=context)
+        port = server.sockets[0].getsockname()[1]
+        url = f"https://127.0.0.1:{port}/api/v2"
+
+        async with server:
+            print(f"{CALLS} sequential GETs against {url}")
+            before = _report("new client per call", await _per_call(url))
+            after = _report("pooled client", await _pooled(url))
+            print(f"saved per call: {before - after:.2f} ms ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark: UniFi client aggregation, multi-pass vs. single pass
+
+Builds synthetic client snapshots shaped like UnifiService.get_clients()
+output and times the original dict-based get_network_stats aggregation
+("before") against app.services.unifi_stats.aggregate_clients over
+ClientRecords ("after"), checking both produce the same result.
+
+Usage (from sbhome/sbhome):
+    python -m scripts.bench_network_stats
+"""
+from typing import Any, Dict, List
+import random
+import statistics
+import time
+
+from app.services.unifi_stats import ClientRecord, aggregate_clients
+
+SIZES = [500, 5000]
+ROUNDS = 50
+
+
+def synthetic_clients(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """Client dicts with a realistic wired/wireless, band and SSID mix"""
+    rng = random.Random(seed)
+    clients = []
+    for i in range(count):
+        wired = rng.random() < 0.3
+        clients.append({
+            "mac": f"02:00:{i >> 16 & 0xff:02x}:{i >> 8 & 0xff:02x}:{i & 0xff:02x}:01",
+            "name": f"client-{i}",
+            "ip": f"10.{i >> 16 & 0xff}.{i >> 8 & 0xff}.{i & 0xff}",
+            "is_wired": wired,
+            "is_guest": rng.random() < 0.05,
+            "ap_mac": None if wired else "02:aa:00:00:00:01",
+            "network": "LAN",
+            "rx_bytes": rng.randint(0, 50_000_000_000),
+            "tx_bytes": rng.randint(0, 5_000_000_000),
+            "signal": 0 if wired else rng.randint(-85, -35),
+            "channel": 0 if wired else rng.choice([6, 36, 149, 37]),
+            "radio": "" if wired else rng.choice(["ng", "na", "na", "6e"]),
+            "essid": "" if wired else rng.choice(["home", "iot", "guest"])
+        })
+    return clients
+
+
+def legacy_aggregate(clients: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The original get_network_stats client aggregation"""
+    wired_clients = sum(1 for c in clients if c["is_wired"])
+    wireless_clients = len(clients) - wired_clients
+
+    clients_with_total = []
+    for client in clients:
+        total_bytes = client["rx_bytes"] + client["tx_bytes"]
+        clients_with_total.append({**client, "total_bytes": total_bytes})
+
+    top_clients = sorted(clients_with_total, key=lambda x: x["total_bytes"], reverse=True)[:10]
+
+    band_2g = sum(1 for c in clients if not c["is_wired"] and c["radio"] == "ng")
+    band_5g = sum(1 for c in clients if not c["is_wired"] and c["radio"] == "na")
+    band_6g = sum(1 for c in clients if not c["is_wired"] and c["radio"] == "6e")
+
+    ssid_counts = {}
+    for client in clients:
+        if not client["is_wired"]:
+            ssid = client.get("essid", "Unknown")
+            ssid_counts[ssid] = ssid_counts.get(ssid, 0) + 1
+
+    if wired_clients > 0:
+        ssid_counts["Wired"] = wired_clients
+
+    return {
+        "total_clients": len(clients),
+        "wired_clients": wired_clients,
+        "wireless_clients": wireless_clients,
+        "top_clients": top_clients,
+        "band_distribution": {"2g": band_2g, "5g": band_5g, "6g": band_6g, "wired": wired_clients},
+        "ssid_distribution": ssid_counts
+    }
+
+
+def _time(func, clients) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(clients)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    print(f"{'clients':>8}  {'before (ms)':>12}  {'after (ms)':>11}  {'speedup':>8}")
+    for size in SIZES:
+        clients = synthetic_clients(size)
+        records = [ClientRecord(**client) for client in clients]
+        assert legacy_aggregate(clients) == aggregate_clients(records), "results differ"
+        before = _time(legacy_aggregate, clients)
+        after = _time(aggregate_clients, records)
+        print(f"{size:>8}  {before:>12.2f}  {after:>11.2f}  {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: API throughput with precomputed payloads and ETag revalidation
+
+Fills the cache with synthetic UniFi clients and Traefik services, then
+drives /api/network/unifi/clients and /api/traefik/services in-process
+(httpx ASGI transport, no network) and reports requests per second for:
+
+  before:    the original routes, re-encoded by FastAPI on every request
+  after:     the current routes, sending the cache's serialized body
+  after+gz:  the same with Accept-Encoding: gzip (compressed once)
+  after 304: revalidation with If-None-Match
+
+Usage (from sbhome/sbhome):
+    python -m scripts.bench_payloads
+"""
+from typing import Any, Dict, List
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.cache import cache
+from app.main import app
+from app.services.traefik_service import traefik_service
+from app.services.unifi_service import unifi_service
+from app.services.unifi_stats import ClientRecord
+from scripts.bench_network_stats import synthetic_clients
+
+CLIENTS = 1000
+SERVICES = 500
+REQUESTS = 300
+PATHS = ["/api/network/unifi/clients", "/api/traefik/services"]
+
+
+def synthetic_services(count: int) -> Dict[str, Any]:
+    """A Traefik HTTP provider /services response"""
+    return {
+        "services": [
+            {
+                "name": f"service-{i}",
+                "public_url": f"https://service-{i}.example.com",
+                "internal_url": f"http://10.0.{i >> 8}.{i & 0xff}:8080",
+                "host": f"service-{i}.example.com",
+                "router": f"service-{i}@docker",
+                "entrypoints": ["websecure"],
+                "middlewares": ["auth@file"] if i % 3 else [],
+                "is_static": i % 5 == 0
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def legacy_app() -> FastAPI:
+    """The routes as they were before, returning Python objects to FastAPI"""
+    legacy = FastAPI()
+
+    @legacy.get("/api/network/unifi/clients")
+    async def get_unifi_clients() -> List[Dict[str, Any]]:
+        return [client.to_dict() for client in await unifi_service.get_clients()]
+
+    @legacy.get("/api/traefik/services")
+    async def get_services() -> Dict[str, Any]:
+        return await traefik_service.get_services()
+
+    return legacy
+
+
+async def _rate(client: httpx.AsyncClient, path: str, headers: Dict[str, str], status: int) -> float:
+    response = await client.get(path, headers=headers)
+    assert response.status_code == status, response.status_code
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await client.get(path, headers=headers)
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def main():
+    records = [ClientRecord(**client) for client in synthetic_clients(CLIENTS)]
+    await cache.set("unifi:clients", records, ttl=3600)
+    await cache.set("traefik:services", synthetic_services(SERVICES), ttl=3600)
+
+    before = httpx.AsyncClient(transport=httpx.ASGITransport(app=legacy_app()), base_url="http://bench")
+    after = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    plain = {"Accept-Encoding": "identity"}
+
+    print(f"{'path':<28} {'before':>8} {'after':>8} {'after+gz':>9} {'after 304':>10}   (req/s)")
+    for path in PATHS:
+        legacy_body = (await before.get(path, headers=plain)).json()
+        response = await after.get(path, headers=plain)
+        assert response.json() == legacy_body, "bodies differ"
+        etag = response.headers["etag"]
+
+        rates = [
+            await _rate(before, path, plain, 200),
+            await _rate(after, path, plain, 200),
+            await _rate(after, path, {"Accept-Encoding": "gzip"}, 200),
+            await _rate(after, path, {**plain, "If-None-Match": etag}, 304)
+        ]
+        gz = await after.get(path, headers={"Accept-Encoding": "gzip"})
+        print(
+            f"{path:<28} {rates[0]:>8.0f} {rates[1]:>8.0f} {rates[2]:>9.0f} {rates[3]:>10.0f}"
+            f"   body {len(response.content) // 1024} KiB, gzip {int(gz.headers['content-length']) // 1024} KiB"
+        )
+
+    await before.aclose()
+    await after.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
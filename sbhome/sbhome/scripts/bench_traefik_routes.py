@@ -0,0 +1,143 @@
+"""
+Benchmark: Traefik route filtering and search, linear scans vs. RouteIndex
+
+Fills the cache with 2,000 synthetic Traefik services and measures
+request latency in-process (httpx ASGI transport, no network) for:
+
+  before: the original re-filtering of the whole service list per request,
+          with search done the same way (no index existed)
+  after:  the current routes, answered from the RouteIndex built once per
+          /services refresh
+
+Lookup time without HTTP overhead is reported too, along with the cost of
+building the index itself.
+
+Usage (from sbhome/sbhome):
+    python -m scripts.bench_traefik_routes
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.cache import cache
+from app.main import app
+from app.services.traefik_service import RouteIndex, _TOKEN_SPLIT, traefik_service
+from scripts.bench_payloads import synthetic_services
+
+SERVICES = 2000
+REQUESTS = 300
+PATHS = [
+    "/api/traefik/routes/static",
+    "/api/traefik/routes?q=service-19&limit=50",
+    "/api/traefik/routes?q=service-1234",
+    "/api/traefik/routes?domain=example.com&static=false&limit=50&offset=1000"
+]
+
+
+def _legacy_query(
+    routes: List[Dict[str, Any]],
+    q: Optional[str] = None,
+    static: Optional[bool] = None,
+    domain: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0
+) -> Dict[str, Any]:
+    """The same search as RouteIndex.query, done with a pass over every route"""
+    words = (q or "").lower().split()
+    matches = []
+    for route in routes:
+        if static is not None and route.get("is_static", False) != static:
+            continue
+        domains = [str(d).lower() for d in route.get("domains") or [route.get("domain")] if d]
+        if domain and not any(d == domain or d.endswith("." + domain) for d in domains):
+            continue
+        values = [str(v).lower() for v in (route.get("name"), route.get("container_name"), route.get("host"), *domains) if v]
+        terms = values + [part for value in values for part in _TOKEN_SPLIT.split(value) if part]
+        if all(any(term.startswith(word) for term in terms) for word in words):
+            matches.append(route)
+    return {"total": len(matches), "offset": offset, "limit": limit, "routes": matches[offset:offset + limit]}
+
+
+def legacy_app() -> FastAPI:
+    """The routes as they were before, filtering the full list per request"""
+    legacy = FastAPI()
+
+    @legacy.get("/api/traefik/routes/static")
+    async def get_static_routes() -> List[Dict[str, Any]]:
+        routes = (await traefik_service.get_services()).get("services", [])
+        return [r for r in routes if r.get("is_static", False)]
+
+    @legacy.get("/api/traefik/routes")
+    async def get_routes(
+        q: Optional[str] = None,
+        static: Optional[bool] = None,
+        domain: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        routes = (await traefik_service.get_services()).get("services", [])
+        return _legacy_query(routes, q, static, domain, limit, offset)
+
+    return legacy
+
+
+async def _latencies(client: httpx.AsyncClient, path: str) -> List[float]:
+    await client.get(path, headers={"Accept-Encoding": "identity"})
+    samples = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        await client.get(path, headers={"Accept-Encoding": "identity"})
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _summary(samples: List[float]) -> str:
+    p95 = statistics.quantiles(samples, n=20)[-1]
+    return f"{statistics.mean(samples):>6.2f} / {p95:>6.2f}"
+
+
+async def main():
+    services = synthetic_services(SERVICES)
+    routes = services["services"]
+    await cache.set("traefik:services", services, ttl=3600)
+
+    start = time.perf_counter()
+    index = RouteIndex(routes)
+    print(f"{SERVICES} services, index build {(time.perf_counter() - start) * 1000:.1f} ms (once per refresh)\n")
+
+    before = httpx.AsyncClient(transport=httpx.ASGITransport(app=legacy_app()), base_url="http://bench")
+    after = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+    print(f"{'request':<72} {'before ms':>15} {'after ms':>15}")
+    print(f"{'':<72} {'mean / p95':>15} {'mean / p95':>15}")
+    for path in PATHS:
+        legacy_body = (await before.get(path)).json()
+        assert (await after.get(path)).json() == legacy_body, f"bodies differ for {path}"
+        print(f"{path:<72} {_summary(await _latencies(before, path)):>15} {_summary(await _latencies(after, path)):>15}")
+
+    print(f"\n{'lookup only (no HTTP)':<44} {'before us':>10} {'after us':>10}")
+    lookups = [
+        ("q=service-19", {"q": "service-19"}),
+        ("q=service-1234", {"q": "service-1234"}),
+        ("domain=example.com&static=false&offset=1000", {"domain": "example.com", "static": False, "offset": 1000})
+    ]
+    for label, params in lookups:
+        assert index.query(**params) == _legacy_query(routes, **params)
+        timings = []
+        for query in (lambda: _legacy_query(routes, **params), lambda: index.query(**params)):
+            start = time.perf_counter()
+            for _ in range(REQUESTS):
+                query()
+            timings.append((time.perf_counter() - start) / REQUESTS * 1e6)
+        print(f"{label:<44} {timings[0]:>10.0f} {timings[1]:>10.0f}")
+
+    await before.aclose()
+    await after.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
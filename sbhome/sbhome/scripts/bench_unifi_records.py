@@ -0,0 +1,63 @@
+"""
+Benchmark: memory held by UniFi client data, dicts vs. slotted records
+
+Measures (with tracemalloc) what one cached generation of client data
+keeps alive at 1k and 10k clients:
+
+  before: a 13-field dict per client, plus the {**client, "total_bytes"}
+          copy of every client the original get_network_stats built
+  after:  a ClientRecord per client, plus aggregate_clients' top 10 dicts
+
+Several TTL generations of these lists can sit in the cache at once, so
+the per-generation figure is what multiplies.
+
+Usage (from sbhome/sbhome):
+    python -m scripts.bench_unifi_records
+"""
+from typing import Any, Callable
+import gc
+import tracemalloc
+
+from app.services.unifi_stats import ClientRecord, aggregate_clients
+from scripts.bench_network_stats import legacy_aggregate, synthetic_clients
+
+SIZES = [1000, 10000]
+
+
+def _retained(build: Callable[[], Any]) -> int:
+    """Bytes still allocated while the result of build() is alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    print(f"{'clients':>8}  {'before (KiB)':>13}  {'after (KiB)':>12}  {'reduction':>9}")
+    for size in SIZES:
+        # Values shared by both layouts (strings, ints) are built up front,
+        # so only the containers are measured
+        raw = synthetic_clients(size)
+        fields = [list(client.items()) for client in raw]
+
+        def before():
+            clients = [dict(items) for items in fields]
+            return clients, legacy_aggregate(clients)
+
+        def after():
+            clients = [ClientRecord(**dict(items)) for items in fields]
+            return clients, aggregate_clients(clients)
+
+        dict_bytes = _retained(before)
+        record_bytes = _retained(after)
+        print(
+            f"{size:>8}  {dict_bytes / 1024:>13.0f}  {record_bytes / 1024:>12.0f}  "
+            f"{1 - record_bytes / dict_bytes:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
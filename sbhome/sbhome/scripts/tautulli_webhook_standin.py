@@ -0,0 +1,92 @@
+"""
+Local stand-in for Tautulli's Webhook notification agent
+
+Posts a random sequence of play, pause, resume and stop notifications,
+shaped like WEBHOOK_TEMPLATE, to a running sbhome instance, e.g.:
+
+    TAUTULLI_URL=http://127.0.0.1:9 TAUTULLI_WEBHOOK_TOKEN=secret \
+        uvicorn app.main:app --port 8000
+    python -m scripts.tautulli_webhook_standin --url http://127.0.0.1:8000 --token secret
+
+then watch /api/media/streams or /api/stream. The webhook endpoint is
+disabled without a token, and Tautulli must be configured for activity
+to be kept; the get_activity poll against the placeholder URL fails
+harmlessly.
+
+Usage (from sbhome/sbhome):
+    python -m scripts.tautulli_webhook_standin [--url URL] [--token T] [--rate 1] [--count 20]
+"""
+import argparse
+import asyncio
+import random
+
+import httpx
+
+TITLES = [
+    ("The Expanse", "Leviathan Wakes", "episode"),
+    ("Severance", "Good News About Hell", "episode"),
+    ("", "Arrival", "movie"),
+    ("", "Dune: Part Two", "movie")
+]
+PLAYERS = [("Living Room", "Plex for Apple TV"), ("Phone", "Plex for iOS"), ("Laptop", "Plex Web")]
+
+
+def _payload(action: str, session_key: str, title, player, progress: int) -> dict:
+    show, name, media_type = title
+    return {
+        "action": action,
+        "session_key": session_key,
+        "user": random.choice(["alex", "sam"]),
+        "full_title": f"{show} - {name}" if show else name,
+        "grandparent_title": show,
+        "title": name,
+        "media_type": media_type,
+        "player": player[0],
+        "product": player[1],
+        "progress_percent": str(progress),
+        "transcode_decision": random.choice(["direct play", "transcode"])
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", default="")
+    parser.add_argument("--rate", type=float, default=1, help="notifications per second")
+    parser.add_argument("--count", type=int, default=20)
+    args = parser.parse_args()
+
+    endpoint = f"{args.url.rstrip('/')}/api/media/webhooks/tautulli"
+    params = {"token": args.token} if args.token else {}
+    sessions = {}  # session_key -> (title, player, progress, paused)
+    next_key = 1
+
+    async with httpx.AsyncClient(timeout=5) as client:
+        for _ in range(args.count):
+            if not sessions or random.random() < 0.3:
+                key = str(next_key)
+                next_key += 1
+                sessions[key] = [random.choice(TITLES), random.choice(PLAYERS), 0, False]
+                action = "play"
+            else:
+                key = random.choice(list(sessions))
+                session = sessions[key]
+                session[2] = min(session[2] + random.randint(5, 30), 100)
+                if session[2] >= 100 or random.random() < 0.2:
+                    action = "stop"
+                elif session[3]:
+                    action = "resume"
+                else:
+                    action = "pause"
+                session[3] = action == "pause"
+
+            title, player, progress, _ = sessions[key]
+            response = await client.post(endpoint, params=params, json=_payload(action, key, title, player, progress))
+            if action == "stop":
+                del sessions[key]
+            print(f"-> {action:<6} session {key}: {response.status_code} {response.text}")
+            await asyncio.sleep(1 / args.rate)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Local stand-in for the UniFi controller event websocket
+
+Serves ws://127.0.0.1:PORT and, to every connection, sends a sta:sync
+snapshot of a few clients followed by a stream of random connect,
+disconnect and roam events. Point sbhome at it with:
+
+    UNIFI_EVENTS_ENABLED=true UNIFI_EVENTS_URL=ws://127.0.0.1:8765 \
+        uvicorn app.main:app
+
+and watch /api/network/unifi/events: the sta:sync push seeds the client
+table and the events keep it current. The table only replaces stat/sta
+polling once a full resync against UNIFI_URL has succeeded, so without a
+controller /api/network/unifi/clients keeps polling (and failing).
+
+Usage (from sbhome/sbhome):
+    python -m scripts.unifi_ws_standin [--port 8765] [--rate 2]
+"""
+import argparse
+import asyncio
+import json
+import random
+
+import websockets
+
+APS = ["02:aa:00:00:00:01", "02:aa:00:00:00:02"]
+
+
+def _client(i: int) -> dict:
+    return {
+        "mac": f"02:00:00:00:00:{i:02x}",
+        "hostname": f"standin-{i}",
+        "ip": f"10.0.0.{i}",
+        "is_wired": False,
+        "ap_mac": random.choice(APS),
+        "essid": "home",
+        "radio": "na",
+        "channel": 36,
+        "rx_bytes": random.randint(0, 10**9),
+        "tx_bytes": random.randint(0, 10**8)
+    }
+
+
+async def _serve(ws, rate: float):
+    online = {i: _client(i) for i in range(1, 6)}
+    await ws.send(json.dumps({"meta": {"rc": "ok", "message": "sta:sync"}, "data": list(online.values())}))
+
+    next_id = 6
+    while True:
+        await asyncio.sleep(1 / rate)
+        action = random.choice(["connect", "disconnect", "roam"])
+        if action == "connect" or not online:
+            client = _client(next_id)
+            online[next_id] = client
+            next_id += 1
+            event = {"key": "EVT_WU_Connected", "user": client["mac"], "hostname": client["hostname"],
+                     "ap": client["ap_mac"], "ssid": "home", "channel": 36, "radio": "na"}
+        elif action == "disconnect":
+            client = online.pop(random.choice(list(online)))
+            event = {"key": "EVT_WU_Disconnected", "user": client["mac"]}
+        else:
+            client = online[random.choice(list(online))]
+            event = {"key": "EVT_WU_Roam", "user": client["mac"], "ap_to": random.choice(APS), "channel_to": 149}
+
+        print(f"-> {event['key']} {event['user']} ({len(online)} online)")
+        try:
+            await ws.send(json.dumps({"meta": {"rc": "ok", "message": "events"}, "data": [event]}))
+        except websockets.ConnectionClosed:
+            print("client disconnected")
+            return
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=2, help="events per second")
+    args = parser.parse_args()
+
+    async with websockets.serve(lambda ws: _serve(ws, args.rate), "127.0.0.1", args.port):
+        print(f"UniFi event stand-in on ws://127.0.0.1:{args.port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
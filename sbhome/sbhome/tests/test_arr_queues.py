@@ -0,0 +1,49 @@
+"""
+Errors in the combined Radarr/Sonarr queue response must not expose upstream URLs or keys
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.cache import cache
+from app.core.http import http_clients
+from app.services.media_service import ArrQueues, ArrQueueService
+
+API_KEY = "s3cret-api-key"
+
+
+def _query(handler) -> dict:
+    async def run():
+        await cache.clear()
+        http_clients._clients["radarr"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            service = ArrQueueService("radarr", "http://radarr.internal:7878", API_KEY)
+            return await ArrQueues([service]).query()
+        finally:
+            await http_clients.shutdown()
+            await cache.clear()
+
+    return asyncio.run(run())
+
+
+def _refused(request: httpx.Request) -> httpx.Response:
+    raise httpx.ConnectError(f"All connection attempts failed for {request.url}?apikey={API_KEY}", request=request)
+
+
+def _unauthorized(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(401, text=f"bad apikey {API_KEY}")
+
+
+@pytest.mark.parametrize("handler, error", [
+    (_refused, "ConnectError"),
+    (_unauthorized, "HTTPStatusError: 401 Unauthorized")
+])
+def test_queue_error_hides_url_and_key(handler, error):
+    result = _query(handler)
+
+    assert result["sources"]["radarr"]["error"] == error
+    body = json.dumps(result)
+    for secret in (API_KEY, "apikey", "radarr.internal", "http://"):
+        assert secret not in body